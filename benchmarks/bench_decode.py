@@ -0,0 +1,34 @@
+import json
+
+import pytest
+from conftest import PAYLOAD_SIZES
+from pyopensprinkler.decoder import JSON_DECODERS, get_json_loads
+
+
+@pytest.mark.parametrize("decoder", JSON_DECODERS)
+@pytest.mark.parametrize("size", ["8_stations", "200_stations_40_programs"])
+def bench_decode(benchmark, start_controller, size, decoder):
+    pytest.importorskip(decoder)
+    emulator, _ = start_controller(*PAYLOAD_SIZES[size])
+    body = json.dumps(emulator.get_state()).encode("utf-8")
+    loads = get_json_loads(decoder)
+
+    benchmark.extra_info["bytes"] = len(body)
+    benchmark(loads, body)
+
+
+@pytest.mark.parametrize("size", ["8_stations", "200_stations_40_programs"])
+def bench_decode_str(benchmark, start_controller, size):
+    """Previous decoding path, through a str copy of the body"""
+    emulator, _ = start_controller(*PAYLOAD_SIZES[size])
+    body = json.dumps(emulator.get_state()).encode("utf-8")
+
+    benchmark(lambda: json.loads(body.decode("UTF-8")))
+
+
+@pytest.mark.parametrize("decoder", JSON_DECODERS)
+def bench_refresh_decoder(benchmark, loop, start_controller, decoder):
+    pytest.importorskip(decoder)
+    _, controller = start_controller(25, 40, opts={"json_decoder": decoder})
+
+    benchmark(lambda: loop.run_until_complete(controller.refresh()))
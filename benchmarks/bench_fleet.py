@@ -0,0 +1,32 @@
+import pytest
+from conftest import PASSWORD
+from pyopensprinkler.emulator import OpenSprinklerEmulator
+from pyopensprinkler.fleet import ControllerFleet
+
+
+@pytest.fixture
+def start_fleet(loop):
+    started = []
+
+    def start(size, emulator_opts=None):
+        fleet = ControllerFleet()
+        for _ in range(size):
+            emulator = OpenSprinklerEmulator(PASSWORD, dict(emulator_opts or {}))
+            started.append(emulator)
+            fleet.add(loop.run_until_complete(emulator.start()), PASSWORD)
+        return fleet
+
+    yield start
+
+    for emulator in started:
+        loop.run_until_complete(emulator.stop())
+
+
+@pytest.mark.parametrize("size", [10, 50])
+def bench_fleet_refresh(benchmark, loop, start_fleet, size):
+    # 5 ms controller response time
+    fleet = start_fleet(size, {"latency": 0.005, "jitter": 0.002, "seed": 1})
+
+    result = benchmark(lambda: loop.run_until_complete(fleet.refresh()))
+    assert result.ok
+    loop.run_until_complete(fleet.session_close())
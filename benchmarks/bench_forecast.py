@@ -0,0 +1,24 @@
+import pytest
+from conftest import PAYLOAD_SIZES
+from pyopensprinkler.forecast import SECONDS_PER_DAY
+
+WINDOWS = {"day": 1, "week": 7, "year": 365}
+
+
+@pytest.mark.parametrize("window", list(WINDOWS))
+def bench_forecast(benchmark, start_controller, window):
+    _, controller = start_controller(*PAYLOAD_SIZES["8_stations_40_programs"])
+    start = controller.device_time
+    end = start + WINDOWS[window] * SECONDS_PER_DAY
+
+    benchmark.extra_info["runs"] = len(controller.forecast(start, end))
+    benchmark(controller.forecast, start, end)
+
+
+@pytest.mark.parametrize("size", ["8_stations_40_programs", "64_stations_40_programs"])
+def bench_projection(benchmark, start_controller, size):
+    _, controller = start_controller(*PAYLOAD_SIZES[size])
+    start = controller.device_time
+    end = start + 7 * SECONDS_PER_DAY
+
+    benchmark(controller.projection, start, end)
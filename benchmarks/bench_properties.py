@@ -0,0 +1,54 @@
+import pytest
+from conftest import PAYLOAD_SIZES
+
+STATION_PROPERTIES = [
+    "name",
+    "is_running",
+    "is_master",
+    "enabled",
+    "sequential_operation",
+    "rain_delay_ignored",
+    "seconds_remaining",
+    "start_time",
+    "end_time",
+    "status",
+]
+
+PROGRAM_PROPERTIES = [
+    "name",
+    "enabled",
+    "use_weather_adjustments",
+    "program_schedule_type",
+    "start_time_type",
+    "program_start_times",
+    "station_durations",
+    "is_running",
+]
+
+
+@pytest.mark.parametrize("size", list(PAYLOAD_SIZES))
+def bench_station_properties(benchmark, start_controller, size):
+    _, controller = start_controller(*PAYLOAD_SIZES[size])
+    stations = list(controller.stations.values())
+
+    def read():
+        for station in stations:
+            for name in STATION_PROPERTIES:
+                getattr(station, name)
+
+    benchmark.extra_info["reads"] = len(stations) * len(STATION_PROPERTIES)
+    benchmark(read)
+
+
+@pytest.mark.parametrize("size", ["8_stations_40_programs", "200_stations_40_programs"])
+def bench_program_properties(benchmark, start_controller, size):
+    _, controller = start_controller(*PAYLOAD_SIZES[size])
+    programs = list(controller.programs.values())
+
+    def read():
+        for program in programs:
+            for name in PROGRAM_PROPERTIES:
+                getattr(program, name)
+
+    benchmark.extra_info["reads"] = len(programs) * len(PROGRAM_PROPERTIES)
+    benchmark(read)
@@ -0,0 +1,28 @@
+import pytest
+from conftest import PAYLOAD_SIZES, peak_allocation
+from pyopensprinkler.const import STATE_PARTS_STATUS
+
+
+@pytest.mark.parametrize("size", list(PAYLOAD_SIZES))
+def bench_refresh(benchmark, loop, start_controller, size):
+    _, controller = start_controller(*PAYLOAD_SIZES[size])
+
+    benchmark.extra_info["peak_bytes"] = peak_allocation(loop, controller.refresh)
+    benchmark(lambda: loop.run_until_complete(controller.refresh()))
+
+
+@pytest.mark.parametrize("size", list(PAYLOAD_SIZES))
+def bench_refresh_status(benchmark, loop, start_controller, size):
+    _, controller = start_controller(*PAYLOAD_SIZES[size])
+
+    def refresh_status():
+        return controller.refresh(STATE_PARTS_STATUS)
+
+    benchmark.extra_info["peak_bytes"] = peak_allocation(loop, refresh_status)
+    benchmark(lambda: loop.run_until_complete(refresh_status()))
+
+
+def bench_refresh_legacy(benchmark, loop, start_controller):
+    _, controller = start_controller(8, 40, emulator_opts={"errors": {"/ja": 32}})
+
+    benchmark(lambda: loop.run_until_complete(controller.refresh()))
@@ -0,0 +1,51 @@
+import pytest
+
+SETTLE_TIMES = [0, 0.01]
+
+
+@pytest.mark.parametrize("settle_time", SETTLE_TIMES)
+def bench_station_run_stop(benchmark, loop, start_controller, settle_time):
+    _, controller = start_controller(
+        8, 0, opts={"auto_refresh_on_update": {"settle_time": settle_time}}
+    )
+    station = controller.stations[0]
+
+    async def run_stop():
+        await station.run(60)
+        await controller.refresh_settled()
+        assert station.is_running
+        await station.stop()
+        await controller.refresh_settled()
+
+    benchmark(lambda: loop.run_until_complete(run_stop()))
+
+
+@pytest.mark.parametrize("wait", [True, False])
+@pytest.mark.parametrize("settle_time", SETTLE_TIMES)
+def bench_station_rename_burst(benchmark, loop, start_controller, settle_time, wait):
+    opts = {"auto_refresh_on_update": {"settle_time": settle_time, "wait": wait}}
+    _, controller = start_controller(8, 0, opts=opts)
+    stations = list(controller.stations.values())[:8]
+
+    async def rename():
+        for station in stations:
+            await station.set_name(f"Zone {station.index + 1}")
+        await controller.refresh_settled()
+
+    benchmark(lambda: loop.run_until_complete(rename()))
+
+
+def bench_station_batch(benchmark, loop, start_controller):
+    _, controller = start_controller(
+        8, 0, opts={"auto_refresh_on_update": {"settle_time": 0}}
+    )
+    stations = list(controller.stations.values())
+
+    async def rename():
+        async with controller.stations.batch():
+            for station in stations:
+                await station.set_name(f"Zone {station.index + 1}")
+                await station.set_rain_delay_ignored(station.index % 2)
+        await controller.refresh_settled()
+
+    benchmark(lambda: loop.run_until_complete(rename()))
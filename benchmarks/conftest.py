@@ -0,0 +1,68 @@
+import asyncio
+import json
+import tracemalloc
+
+import pytest
+from pyopensprinkler import Controller
+from pyopensprinkler.emulator import OpenSprinklerEmulator
+
+PASSWORD = "opendoor"
+
+# (expansion boards, programs) of a small and a large controller
+PAYLOAD_SIZES = {
+    "8_stations": (1, 0),
+    "8_stations_40_programs": (1, 40),
+    "64_stations_40_programs": (8, 40),
+    "200_stations_40_programs": (25, 40),
+}
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def start_controller(loop):
+    """Start an emulator and a refreshed controller, stopped on teardown"""
+    started = []
+
+    def start(boards=1, programs=0, opts=None, emulator_opts=None):
+        emulator_opts = dict(emulator_opts or {})
+        emulator_opts["boards"] = boards
+        emulator = OpenSprinklerEmulator(PASSWORD, emulator_opts)
+        url = loop.run_until_complete(emulator.start())
+        controller = Controller(url, PASSWORD, dict(opts or {}))
+        started.append((emulator, controller))
+
+        async def populate():
+            durations = [(sid % 5 + 1) * 60 for sid in range(boards * 8)]
+            for pid in range(programs):
+                data = [1, 127, 0, [pid * 30, -1, -1, -1], durations]
+                await controller.request(
+                    "/cp",
+                    {"pid": -1, "name": f"Program {pid + 1}", "v": json.dumps(data)},
+                    refresh_on_update=False,
+                )
+            await controller.refresh()
+
+        loop.run_until_complete(populate())
+        return emulator, controller
+
+    yield start
+
+    for emulator, controller in started:
+        loop.run_until_complete(controller.session_close())
+        loop.run_until_complete(emulator.stop())
+
+
+def peak_allocation(loop, coroutine_function):
+    """Peak bytes allocated while running a coroutine function once"""
+    tracemalloc.start()
+    try:
+        loop.run_until_complete(coroutine_function())
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
@@ -2,11 +2,11 @@
 
 import asyncio
 import datetime
-import functools
 import hashlib
 import json
 import os
-import threading
+import ssl
+import time
 import urllib
 
 import aiohttp
@@ -29,6 +29,7 @@ from pyopensprinkler.const import (
     REBOOT_CAUSE_POWER_ON,
     REBOOT_CAUSE_RESET_BUTTON,
     REBOOT_CAUSE_WEATHER_FAILURE,
+    RETRY_PATHS,
     SENSOR_OPTION_NORMALLY_CLOSED,
     SENSOR_OPTION_NORMALLY_OPEN,
     SENSOR_TYPE_FLOW,
@@ -36,30 +37,39 @@ from pyopensprinkler.const import (
     SENSOR_TYPE_PROGRAM_SWITCH,
     SENSOR_TYPE_RAIN,
     SENSOR_TYPE_SOIL,
+    STATE_ENDPOINTS,
+    UPDATE_PATH_STATE_PARTS,
     WEATHER_ERROR_CANT_CONNECT,
     WEATHER_ERROR_EMPTY_RESPONSE,
     WEATHER_ERROR_NOT_RECEIVED,
     WEATHER_ERROR_TIME_OUT,
 )
+from pyopensprinkler.breaker import CircuitBreaker
+from pyopensprinkler.decoder import get_json_loads
+from pyopensprinkler.events import diff_states
+from pyopensprinkler.forecast import SECONDS_PER_DAY, _to_timestamp, forecast_state
+from pyopensprinkler.log import LogCache, parse_record
 from pyopensprinkler.program import Program
-from pyopensprinkler.station import Station
-
-
-def synchronized(lock):
-    """Synchronization decorator"""
-
-    def wrap(f):
-        @functools.wraps(f)
-        def newFunction(*args, **kw):
-            with lock:
-                return f(*args, **kw)
-
-        return newFunction
-
-    return wrap
+from pyopensprinkler.poller import Poller, poll_interval
+from pyopensprinkler.projection import project_runs
+from pyopensprinkler.refresh import RefreshCoalescer, _retrieve_exception
+from pyopensprinkler.scheduler import RequestScheduler
+from pyopensprinkler.snapshot import dump_snapshot, load_snapshot
+from pyopensprinkler.station import Station, Stations, _decode_station_bits
+
+
+def _notify_retry(details):
+    """Call request hooks before backoff retries a request"""
+    controller, _, path = details["args"]
+    for hook in controller._opts["hooks"]:
+        hook.request_retried(
+            controller, path, details["tries"], details["wait"], details["exception"]
+        )
 
 
-lock = threading.Lock()
+def _is_circuit_open(exc):
+    """Do not retry requests refused by the circuit breaker"""
+    return isinstance(exc, OpenSprinklerCircuitOpenError)
 
 
 class OpenSprinklerAuthError(Exception):
@@ -70,6 +80,10 @@ class OpenSprinklerConnectionError(Exception):
     """Exception for connection error."""
 
 
+class OpenSprinklerCircuitOpenError(OpenSprinklerConnectionError):
+    """Exception for requests refused while the controller is unreachable."""
+
+
 class OpenSprinklerNoStateError(Exception):
     """Exception for no state."""
 
@@ -78,6 +92,23 @@ class OpenSprinklerApiError(Exception):
     """Exception for an error returned by the API."""
 
 
+def _index_program_stations(state):
+    """Index running and queued station indexes by 1 indexed program id"""
+    index = {}
+    for station_index, (is_running, status) in enumerate(
+        zip(state["status"]["sn"], state["settings"]["ps"])
+    ):
+        pid = status[0]
+        if pid == 0:
+            continue
+        running, queued = index.setdefault(pid, ([], []))
+        if is_running:
+            running.append(station_index)
+        else:
+            queued.append(station_index)
+    return index
+
+
 class Controller(object):
     """OpenSprinkler Controller"""
 
@@ -92,9 +123,13 @@ class Controller(object):
         self._baseUrl = url.strip("/")
         self._opts = opts
         self._programs = {}
-        self._stations = {}
+        self._stations = Stations(self)
         self._state = None
+        self._state_times = {}
+        self._derived = {}
+        self._refresh_task = None
         self._last_refresh_time = None
+        self._refresh_errors = {}
         self._http_client = None
         self._skip_all_endpoint = os.environ.get(
             "PYOPENSPRINKLER_SKIP_ALL_ENDPOINT", None
@@ -124,11 +159,117 @@ class Controller(object):
         if "settle_time" not in opts["auto_refresh_on_update"]:
             opts["auto_refresh_on_update"]["settle_time"] = 1
 
+        if "wait" not in opts["auto_refresh_on_update"]:
+            opts["auto_refresh_on_update"]["wait"] = True
+
+        # firmware handles a single request at a time
+        if "request_concurrency" not in opts:
+            opts["request_concurrency"] = 1
+
+        if "dns_cache_ttl" not in opts:
+            opts["dns_cache_ttl"] = 300
+
+        if "keepalive_timeout" not in opts:
+            opts["keepalive_timeout"] = 60
+
+        # refresh state in the background when read after max_age seconds
+        if "max_age" not in opts:
+            opts["max_age"] = None
+
+        # RequestHooks called on requests and refreshes, see metrics module
+        if "hooks" not in opts:
+            opts["hooks"] = []
+
+        # orjson, ujson or json, the fastest installed by default
+        if "json_decoder" not in opts:
+            opts["json_decoder"] = None
+
+        # fail fast after consecutive connection failures, see CircuitBreaker
+        if "circuit_breaker" not in opts:
+            opts["circuit_breaker"] = {}
+
+        if "enabled" not in opts["circuit_breaker"]:
+            opts["circuit_breaker"]["enabled"] = True
+
+        if "failure_threshold" not in opts["circuit_breaker"]:
+            opts["circuit_breaker"]["failure_threshold"] = 5
+
+        if "recovery_time" not in opts["circuit_breaker"]:
+            opts["circuit_breaker"]["recovery_time"] = 30
+
+        # directory caching log records of completed days, memory only by default
+        if "log_cache_dir" not in opts:
+            opts["log_cache_dir"] = None
+
+        # poll intervals while watering and idle, see poll_interval
+        if "polling" not in opts:
+            opts["polling"] = {}
+
+        if "fast_interval" not in opts["polling"]:
+            opts["polling"]["fast_interval"] = 5
+
+        if "slow_interval" not in opts["polling"]:
+            opts["polling"]["slow_interval"] = 60
+
+        if "parts" not in opts["polling"]:
+            opts["polling"]["parts"] = None
+
+        self._request_kwargs = self._prepare_request_kwargs()
+        self._json_loads = get_json_loads(opts["json_decoder"])
+        self._log_cache = LogCache(opts["log_cache_dir"], self._baseUrl)
+        self._circuit_breaker = None
+        if opts["circuit_breaker"]["enabled"]:
+            self._circuit_breaker = CircuitBreaker(
+                opts["circuit_breaker"]["failure_threshold"],
+                opts["circuit_breaker"]["recovery_time"],
+            )
+        self._scheduler = RequestScheduler(opts["request_concurrency"])
+        self._poller = Poller(self, opts["polling"]["parts"])
+        self._refresh_coalescer = RefreshCoalescer(
+            self._auto_refresh, opts["auto_refresh_on_update"]["settle_time"]
+        )
+
+    def _prepare_request_kwargs(self):
+        """Build request arguments shared by every request"""
+        kwargs = {
+            "timeout": aiohttp.ClientTimeout(total=60),
+            "headers": {"Accept": "*/*", "Connection": "keep-alive"},
+        }
+
+        if "http_username" in self._opts:
+            kwargs["auth"] = aiohttp.BasicAuth(
+                self._opts["http_username"], self._opts["http_password"]
+            )
+
+        if self._opts.get("verify_ssl") is False:
+            kwargs["ssl"] = False
+
+        return kwargs
+
     def session_start(self):
-        client = aiohttp.ClientSession()
+        ssl_context = None
+        if self._baseUrl.startswith("https") and "ssl" not in self._request_kwargs:
+            # created once, loading the CA certificates is expensive
+            ssl_context = ssl.create_default_context()
+
+        connector = aiohttp.TCPConnector(
+            limit_per_host=self._opts["request_concurrency"],
+            ttl_dns_cache=self._opts["dns_cache_ttl"],
+            keepalive_timeout=self._opts["keepalive_timeout"],
+            ssl=ssl_context if ssl_context is not None else True,
+        )
+        client = aiohttp.ClientSession(
+            connector=connector, cookie_jar=aiohttp.DummyCookieJar()
+        )
         self._http_client = client
 
     async def session_close(self):
+        self._refresh_coalescer.cancel()
+        try:
+            await self._poller.stop()
+        except Exception:
+            # the error ending the loop is not a reason to keep the session open
+            pass
         if self._http_client is not None and "session" not in self._opts:
             await self._http_client.close()
             self._http_client = None
@@ -143,7 +284,7 @@ class Controller(object):
             qs = qs + "&" + raw_qs
         url = f"{self._baseUrl}{path}?{qs}"
 
-        content = await self._request_http(url)
+        content = await self._request_http(url, path)
 
         refresh = self._opts["auto_refresh_on_update"]["enabled"]
         if self.refresh_on_update is not None:
@@ -152,96 +293,233 @@ class Controller(object):
         if refresh_on_update is not None:
             refresh = refresh_on_update
 
-        update_paths = [
-            "/cv",
-            "/co",
-            "/cs",
-            "/cm",
-            "/mp",
-            "/cp",
-            "/dp",
-            "/up",
-            "/cr",
-            "/pq",
-        ]
-        if refresh and path in update_paths:
+        if refresh and path in UPDATE_PATH_STATE_PARTS:
             #  .1 was not enough settle time
             # .25 was mostly good but still too fast at times
             #  .5 was mostly good but still too fast at times
             # .75 was mostly good but still too fast at times
             #   1 was consistently enough time
-            await asyncio.sleep(
-                float(self._opts["auto_refresh_on_update"]["settle_time"])
+            # a burst of updates shares a single refresh once the last one settled,
+            # limited to the state parts the updates invalidated
+            refreshed = self._refresh_coalescer.mark_dirty(
+                UPDATE_PATH_STATE_PARTS[path]
             )
-            await self.refresh()
+            if self._opts["auto_refresh_on_update"]["wait"]:
+                await refreshed
 
         return content
 
-    @synchronized(lock)
-    @on_exception(expo, OpenSprinklerConnectionError, max_tries=3)
-    async def _request_http(self, url):
+    async def refresh_settled(self):
+        """Wait for the pending auto refresh of previous updates, if any"""
+        return await self._refresh_coalescer.wait()
+
+    async def _auto_refresh(self, parts):
+        """Refresh after updates settled"""
+        for hook in self._opts["hooks"]:
+            hook.auto_refresh_started(
+                self, parts, self._refresh_coalescer.last_settle_time
+            )
+        return await self._refresh_now(parts)
+
+    async def _request_http(self, url, path):
+        # commands are not retried, they could run twice when only the response
+        # got lost
+        if path in RETRY_PATHS:
+            return await self._request_http_retried(url, path)
+        return await self._request_http_once(url, path)
+
+    @on_exception(
+        expo,
+        OpenSprinklerConnectionError,
+        max_tries=3,
+        on_backoff=_notify_retry,
+        giveup=_is_circuit_open,
+    )
+    async def _request_http_retried(self, url, path):
+        return await self._request_http_once(url, path)
+
+    async def _request_http_once(self, url, path):
+        breaker = self._circuit_breaker
+        if breaker is not None and not breaker.allow():
+            raise OpenSprinklerCircuitOpenError(
+                f"Controller unreachable, retry in {breaker.retry_after:.0f} seconds"
+            )
+
         try:
-            if self._http_client is None:
-                self.session_start()
+            async with self._scheduler:
+                content = await self._send_http(url, path)
+        except OpenSprinklerConnectionError:
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            if breaker is not None:
+                breaker.release()
+            raise
+        except Exception:
+            # the controller answered
+            if breaker is not None:
+                breaker.record_success()
+            raise
+
+        if breaker is not None:
+            breaker.record_success()
+        return content
 
-            timeout = aiohttp.ClientTimeout(total=60)
-            headers = {"Accept": "*/*", "Connection": "keep-alive"}
+    async def _send_http(self, url, path):
+        started = time.perf_counter()
+        try:
+            content, size, decode_time = await self._get_http(url)
+        except Exception as exc:
+            for hook in self._opts["hooks"]:
+                hook.request_failed(self, path, time.perf_counter() - started, exc)
+            raise
+
+        for hook in self._opts["hooks"]:
+            hook.request_finished(
+                self, path, time.perf_counter() - started, size, decode_time
+            )
+        return content
 
-            auth = None
-            if "http_username" in self._opts:
-                auth = aiohttp.BasicAuth(
-                    self._opts["http_username"], self._opts["http_password"]
-                )
+    async def _get_http(self, url):
+        """Retrieve content, payload size and decode time of a request"""
+        try:
+            if self._http_client is None:
+                self.session_start()
 
-            verify_ssl = None
-            if "verify_ssl" in self._opts:
-                verify_ssl = self._opts["verify_ssl"]
+            # sessions created by session_start do not store cookies
+            if "session" in self._opts:
+                self._http_client.cookie_jar.clear()
 
-            self._http_client.cookie_jar.clear()
+            async with self._http_client.get(url, **self._request_kwargs) as resp:
+                # a response without content type is an authentication failure
+                resp.headers["Content-Type"]
+                body = await resp.read()
 
-            async with self._http_client.get(
-                url, timeout=timeout, headers=headers, verify_ssl=verify_ssl, auth=auth
-            ) as resp:
-                content = await resp.json(
-                    encoding="UTF-8", content_type=resp.headers["Content-Type"]
-                )
+            # decoded from the bytes, without an intermediate str copy
+            decode_started = time.perf_counter()
+            content = self._json_loads(body) if body.strip() else None
+            decode_time = time.perf_counter() - decode_started
 
-                if len(content) == 1:
-                    if "result" in content:
-                        if content["result"] == 2:
-                            raise OpenSprinklerAuthError("Invalid password")
-                        elif content["result"] > 2:
-                            raise OpenSprinklerApiError(
-                                f"Error code: {content['result']}", content["result"]
-                            )
-                    elif "fwv" in content:
+            if len(content) == 1:
+                if "result" in content:
+                    if content["result"] == 2:
                         raise OpenSprinklerAuthError("Invalid password")
-
-                return content
+                    elif content["result"] > 2:
+                        raise OpenSprinklerApiError(
+                            f"Error code: {content['result']}", content["result"]
+                        )
+                elif "fwv" in content:
+                    raise OpenSprinklerAuthError("Invalid password")
+
+            return content, len(body), decode_time
         except aiohttp.ClientConnectionError as exc:
             raise OpenSprinklerConnectionError("Cannot connect to controller") from exc
         except ConnectionError as exc:
             raise OpenSprinklerConnectionError("Cannot connect to controller") from exc
-        except json.decoder.JSONDecodeError as exc:
+        except asyncio.TimeoutError as exc:
+            raise OpenSprinklerConnectionError("Controller request timed out") from exc
+        except ValueError as exc:
+            # invalid JSON, decoders raise ValueError subclasses
             raise OpenSprinklerConnectionError("Cannot connect to controller") from exc
         except KeyError as exc:
             raise OpenSprinklerAuthError("Invalid password") from exc
 
-    async def refresh(self):
-        """Refresh programs and stations"""
-        await self._refresh_state()
+    async def refresh(self, parts=None):
+        """
+        Refresh programs and stations
+
+        parts limits the refresh to the given state parts ('settings', 'options',
+        'stations', 'status', 'programs'), merged into the current state. Use
+        STATE_PARTS_STATUS for frequent polling of running stations. The pending
+        auto refresh of previous updates is awaited first, and is enough when it covers
+        the parts. Raises the first error when none of the parts could be fetched, the
+        refresh time is left as is.
+        """
+        coalescer = self._refresh_coalescer
+        if coalescer.dirty:
+            pending = coalescer.pending_parts
+            await coalescer.wait()
+            if pending is None or (parts is not None and pending.issuperset(parts)):
+                return
+        await self._refresh_now(parts)
+
+    async def _refresh_now(self, parts=None):
+        """Refresh without waiting for the auto refresh of previous updates"""
+        started = time.perf_counter()
+        await self._refresh_state(parts)
         self._last_refresh_time = int(round(datetime.datetime.now().timestamp()))
 
-        self._programs = {}
-        for i, _ in enumerate(self._state["programs"]["pd"]):
-            if i not in self._programs:
-                self._programs[i] = Program(self, i)
+        self._reconcile_objects()
+
+        for hook in self._opts["hooks"]:
+            hook.refresh_finished(self, parts, time.perf_counter() - started)
+
+    @classmethod
+    def from_snapshot(cls, path, password="", opts=None, url=None):
+        """
+        Create a controller serving the state of a snapshot, without any request
 
-        for i, _ in enumerate(self._state["stations"]["snames"]):
-            if i not in self._stations:
-                self._stations[i] = Station(self, i)
+        path is a file written by save_snapshot or a /ja JSON document captured from
+        a controller. url defaults to the one of the snapshot. With the max_age
+        option the first read of an old state refreshes it in the background.
+        """
+        controller = cls(url or "", password, opts)
+        snapshot = load_snapshot(path, controller._json_loads)
+        if url is None and snapshot.url is not None:
+            controller._baseUrl = snapshot.url
+            # cached log records are kept per controller url
+            controller._log_cache = LogCache(
+                controller._opts["log_cache_dir"], controller._baseUrl
+            )
+
+        controller._state = snapshot.state
+        controller._state_times = dict(snapshot.state_times)
+        if snapshot.state_times:
+            controller._last_refresh_time = int(
+                round(max(snapshot.state_times.values()))
+            )
+        controller._invalidate_derived()
+        controller._reconcile_objects()
+        return controller
+
+    def save_snapshot(self, path):
+        """Save the state to a snapshot file, see from_snapshot"""
+        if self._state is None:
+            raise OpenSprinklerNoStateError("No state. Please refresh")
+        dump_snapshot(path, self._baseUrl, self._state, self._state_times)
+
+    def _reconcile_objects(self):
+        # programs and stations survive refreshes, only the counts are reconciled
+        self._reconcile(self._programs, len(self._state["programs"]["pd"]), Program)
+        self._reconcile(self._stations, len(self._state["stations"]["snames"]), Station)
+
+    def _reconcile(self, objects, count, factory):
+        """Create objects of missing indexes and drop those of indexes past count"""
+        if len(objects) == count:
+            return
+
+        for i in range(count):
+            if i not in objects:
+                objects[i] = factory(self, i)
+
+        for i in [i for i in objects if i >= count]:
+            del objects[i]
+
+    async def _refresh_state(self, parts=None):
+        if parts is not None:
+            for part in parts:
+                if part not in STATE_ENDPOINTS:
+                    raise ValueError(f"Unknown state part: {part}")
+
+            # a full refresh is needed without state, and is cheaper for all parts
+            if self._state is not None and set(parts) != set(STATE_ENDPOINTS):
+                content = await self._request_parts(list(parts))
+                state = dict(self._state)
+                state.update(content)
+                self._set_state(state, content)
+                return
 
-    async def _refresh_state(self):
         use_ja = True
         if self._skip_all_endpoint is not None:
             use_ja = not self._skip_all_endpoint
@@ -249,10 +527,11 @@ class Controller(object):
         if use_ja:
             try:
                 content = await self.request("/ja")
-                self._state = content
+                self._refresh_errors = {}
+                self._set_state(content)
                 return
             except OpenSprinklerApiError as exc:
-                (_, err_code) = exc.args
+                _, err_code = exc.args
                 if err_code == 32:
                     # set for preemptive behavior on all subsequent calls
                     self._skip_all_endpoint = True
@@ -261,26 +540,254 @@ class Controller(object):
 
         # Backwards compatibility for pre 2.1.6
         # Fallback
-        settings = await self.request("/jc")
-        options = await self.request("/jo")
-        stations = await self.request("/jn")
-        status = await self.request("/js")
-        programs = await self.request("/jp")
-        content = {
-            "settings": settings,
-            "options": options,
-            "stations": stations,
-            "status": status,
-            "programs": programs,
-        }
+        content = await self._request_parts(list(STATE_ENDPOINTS))
+        self._set_state(content, content)
+
+    async def _request_parts(self, parts):
+        """
+        Request state parts from their endpoints concurrently
+
+        Concurrency is bounded by the request scheduler. When some parts were fetched,
+        parts failing with a connection or API error keep their last known value. The
+        first error is raised if there is none, or if no part was fetched at all.
+        """
+        responses = await asyncio.gather(
+            *[self.request(STATE_ENDPOINTS[part]) for part in parts],
+            return_exceptions=True,
+        )
 
-        self._state = content
+        failures = [
+            response for response in responses if isinstance(response, BaseException)
+        ]
+        if len(failures) == len(parts):
+            # nothing was fetched, the controller is unreachable or refused
+            raise failures[0]
+
+        content = {}
+        errors = {}
+        for part, response in zip(parts, responses):
+            if not isinstance(response, BaseException):
+                content[part] = response
+                continue
+
+            recoverable = isinstance(
+                response, (OpenSprinklerConnectionError, OpenSprinklerApiError)
+            )
+            if not recoverable or self._state is None or part not in self._state:
+                raise response
+
+            # kept parts are not fresh, keep their refresh time as well
+            content[part] = self._state[part]
+            errors[part] = response
+
+        self._refresh_errors = errors
+        return content
+
+    def _set_state(self, state, refreshed=None):
+        """Replace state, recording the refresh time of refreshed parts (all by default)"""
+        now = time.time()
+        if refreshed is None:
+            refreshed = STATE_ENDPOINTS
+
+        for part in refreshed:
+            if part not in self._refresh_errors:
+                self._state_times[part] = now
+
+        self._state = state
+        self._invalidate_derived()
+
+    def _invalidate_derived(self):
+        """Drop values derived from state, rebuilt on next access"""
+        self._derived = {}
+
+    def _get_derived(self, key, build):
+        """Retrieve a value derived from state, built once per state change"""
+        state = self._retrieve_state()
+        try:
+            return self._derived[key]
+        except KeyError:
+            value = self._derived[key] = build(state)
+            return value
+
+    def _get_station_bits(self):
+        """Retrieve station bit arrays as one integer per property, bit n is station n"""
+        return self._get_derived("station_bits", _decode_station_bits)
+
+    def _get_program_stations(self):
+        """Retrieve running and queued station indexes by 1 indexed program id"""
+        return self._get_derived("program_stations", _index_program_stations)
+
+    def _stale_parts(self, max_age):
+        """Retrieve state parts older than max_age seconds"""
+        now = time.time()
+        return [
+            part
+            for part in STATE_ENDPOINTS
+            if now - self._state_times.get(part, 0) > max_age
+        ]
+
+    def forecast(self, start, end):
+        """
+        Compute upcoming station runs from program schedules, without requests
+
+        start and end are datetimes or UTC timestamps, see forecast_state.
+        """
+        return forecast_state(self._retrieve_state(), start, end)
+
+    def projection(self, start, end, flow_rates=None):
+        """
+        Estimate runtime and water volume per station, program and day
+
+        flow_rates maps station index to volume per minute. Other stations are listed
+        in unknown_flow_stations: the measured flow rate is the live reading of the
+        whole controller, not a per station rate. See project_runs.
+        """
+        return project_runs(
+            self.forecast(start, end),
+            flow_rates,
+            None,
+            start,
+            end,
+            self._utc_offset(),
+        )
+
+    def station_table(self, as_numpy=False):
+        """Retrieve a columnar snapshot of all stations, see Stations.table"""
+        return self._stations.table(as_numpy)
+
+    async def logs(self, start, end):
+        """
+        Retrieve watering log records ending from start to end, oldest first
+
+        start and end are datetimes or UTC timestamps. Records are LogRecord
+        instances fetched with one /jl request per device day. Days completed before
+        the current device day are cached (on disk too with the log_cache_dir
+        option) and never fetched again.
+        """
+        if self._state is None:
+            await self.refresh()
+
+        start = _to_timestamp(start)
+        end = _to_timestamp(end)
+        offset = self._utc_offset()
+
+        # device time now, from the device time of the last settings refresh
+        refreshed = self._state_times.get("settings", time.time())
+        device_time = self._get_variable("devt") + time.time() - refreshed
+        today = int(device_time // SECONDS_PER_DAY)
+
+        first_day = (start + offset) // SECONDS_PER_DAY
+        last_day = min((end + offset) // SECONDS_PER_DAY, today)
+        for day in range(first_day, last_day + 1):
+            records = self._log_cache.get(day)
+            if records is None:
+                day_start = day * SECONDS_PER_DAY
+                records = await self.request(
+                    "/jl", {"start": day_start, "end": day_start + SECONDS_PER_DAY - 1}
+                )
+                if day < today:
+                    self._log_cache.set(day, records)
+
+            for record in sorted(records, key=lambda record: record[3]):
+                log_record = parse_record(record, offset)
+                if start <= log_record.end <= end:
+                    yield log_record
+
+    async def watch(self, interval=None, parts=None):
+        """
+        Poll state every interval seconds, yielding change events
+
+        Events are ControllerEvent instances computed from consecutive states, which
+        includes changes made by updates in between. Connection errors, timeouts
+        included, are retried on the next poll. interval of None adapts it to activity, see poll_interval.
+        """
+        if self._state is None:
+            await self.refresh()
+        previous = self._state
+
+        while True:
+            await asyncio.sleep(self.poll_interval if interval is None else interval)
+            try:
+                await self.refresh(parts)
+            except OpenSprinklerConnectionError:
+                continue
+
+            for event in diff_states(previous, self._state):
+                yield event
+            previous = self._state
+
+    @property
+    def poll_interval(self):
+        """Seconds until the next poll, short while watering and long when idle"""
+        return poll_interval(
+            self,
+            self._opts["polling"]["fast_interval"],
+            self._opts["polling"]["slow_interval"],
+        )
+
+    @property
+    def polling(self):
+        """Return True while polling in the background"""
+        return self._poller.running
+
+    def start_polling(self):
+        """Refresh state in the background at the poll_interval"""
+        self._poller.start()
+
+    async def stop_polling(self):
+        """Stop background polling"""
+        await self._poller.stop()
 
     def _retrieve_state(self):
         if self._state is None:
             raise OpenSprinklerNoStateError("No state. Please refresh")
+
+        max_age = self._opts["max_age"]
+        if max_age is not None and self.state_age > max_age:
+            self._refresh_in_background()
+
         return self._state
 
+    def _refresh_in_background(self):
+        """Start a refresh of stale parts unless one is already running"""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        self._refresh_task = loop.create_task(self._refresh_stale())
+        self._refresh_task.add_done_callback(_retrieve_exception)
+
+    async def _refresh_stale(self, max_age=None):
+        if max_age is None:
+            max_age = self._opts["max_age"] or 0
+
+        parts = self._stale_parts(max_age)
+        if self._state is None or len(parts) == len(STATE_ENDPOINTS):
+            parts = None
+
+        await self.refresh(parts)
+
+    async def ensure_fresh(self, max_age=None):
+        """
+        Refresh state parts older than max_age seconds (max_age option by default)
+
+        Concurrent callers share a single refresh.
+        """
+        if max_age is None:
+            max_age = self._opts["max_age"] or 0
+
+        if self._refresh_task is not None and not self._refresh_task.done():
+            await asyncio.shield(self._refresh_task)
+
+        if self._state is None or self.state_age > max_age:
+            self._refresh_task = asyncio.ensure_future(self._refresh_stale(max_age))
+            self._refresh_task.add_done_callback(_retrieve_exception)
+            await asyncio.shield(self._refresh_task)
+
     def _get_option(self, option):
         """Retrieve option"""
         try:
@@ -372,11 +879,14 @@ class Controller(object):
 
         return ip
 
+    def _utc_offset(self):
+        """Retrieve device time zone offset in seconds"""
+        return (self._get_option("tz") - 48) * 15 * 60
+
     def _timestamp_to_utc(self, timestamp):
         if timestamp is None:
             return None
-        offset = (self._get_option("tz") - 48) * 15 * 60
-        return timestamp if timestamp == 0 else timestamp - offset
+        return timestamp if timestamp == 0 else timestamp - self._utc_offset()
 
     # controller variables
     async def enable(self):
@@ -473,11 +983,39 @@ class Controller(object):
         content = await self.request("/dp", {"pid": index})
         return content["result"]
 
+    @property
+    def circuit_breaker(self):
+        """Return circuit breaker, None when disabled"""
+        return self._circuit_breaker
+
+    @property
+    def request_scheduler(self):
+        """Return request scheduler"""
+        return self._scheduler
+
     @property
     def last_refresh_time(self):
         """Retrieve last refresh time"""
         return self._last_refresh_time
 
+    @property
+    def state_age(self):
+        """Retrieve age in seconds of the oldest state part, None without state"""
+        if self._state is None:
+            return None
+        return time.time() - min(
+            self._state_times.get(part, 0) for part in STATE_ENDPOINTS
+        )
+
+    @property
+    def last_refresh_errors(self):
+        """
+        Retrieve errors of the last refresh
+
+        Dict of state part to error for parts which kept their last known value.
+        """
+        return self._refresh_errors
+
     @property
     def enabled(self):
         """Retrieve operation enabled"""
@@ -0,0 +1,85 @@
+"""Breaker module failing requests fast while a controller is unreachable."""
+
+import time
+
+from pyopensprinkler.const import CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN
+
+
+class CircuitBreaker(object):
+    """
+    Circuit breaker of a controller
+
+    Opens after failure_threshold consecutive connection failures. While open,
+    requests are refused until recovery_time seconds passed, then a single trial
+    request is let through (half open), closing the circuit on success and opening
+    it again on failure.
+    """
+
+    def __init__(self, failure_threshold=5, recovery_time=30, clock=time.monotonic):
+        """Circuit breaker initializer."""
+        self._failure_threshold = failure_threshold
+        self._recovery_time = recovery_time
+        self._clock = clock
+        self._state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def allow(self):
+        """Return True if a request may be sent, claiming the trial when half open"""
+        if self._state == CIRCUIT_CLOSED:
+            return True
+
+        if self._state == CIRCUIT_OPEN:
+            if self.retry_after > 0:
+                return False
+            self._state = CIRCUIT_HALF_OPEN
+            self._trial = False
+
+        if self._trial:
+            return False
+        self._trial = True
+        return True
+
+    def record_success(self):
+        self._state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def record_failure(self):
+        self._failures += 1
+        self._trial = False
+        if (
+            self._state == CIRCUIT_HALF_OPEN
+            or self._failures >= self._failure_threshold
+        ):
+            self._state = CIRCUIT_OPEN
+            self._opened_at = self._clock()
+
+    def release(self):
+        """Give back the trial of a request that did not complete"""
+        self._trial = False
+
+    def reset(self):
+        """Close the circuit"""
+        self.record_success()
+
+    @property
+    def state(self):
+        """Retrieve state, closed, open or half_open"""
+        if self._state == CIRCUIT_OPEN and self.retry_after == 0:
+            return CIRCUIT_HALF_OPEN
+        return self._state
+
+    @property
+    def failures(self):
+        """Number of consecutive failures"""
+        return self._failures
+
+    @property
+    def retry_after(self):
+        """Seconds until a trial request is allowed, 0 unless open"""
+        if self._state != CIRCUIT_OPEN:
+            return 0
+        return max(self._opened_at + self._recovery_time - self._clock(), 0)
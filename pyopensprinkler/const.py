@@ -32,6 +32,58 @@ REBOOT_CAUSE_POWER_ON = "power_on"
 REBOOT_CAUSE_RESET_BUTTON = "buttons"
 REBOOT_CAUSE_WEATHER_FAILURE = "weather_call_failure"
 
+# state parts and their endpoints, /ja returns all of them at once
+STATE_ENDPOINTS = {
+    "settings": "/jc",
+    "options": "/jo",
+    "stations": "/jn",
+    "status": "/js",
+    "programs": "/jp",
+}
+
+STATE_PARTS_OPTIONS = ["options"]
+STATE_PARTS_PROGRAMS = ["programs"]
+STATE_PARTS_STATIONS = ["stations"]
+STATE_PARTS_STATUS = ["settings", "status"]
+
+# state parts invalidated by each update endpoint
+UPDATE_PATH_STATE_PARTS = {
+    "/cv": ["settings", "status"],
+    "/co": ["options", "settings"],
+    "/cs": ["stations"],
+    "/cm": ["settings", "status"],
+    "/mp": ["settings", "status"],
+    "/cp": ["programs"],
+    "/dp": ["programs"],
+    "/up": ["programs"],
+    "/cr": ["settings", "status"],
+    "/pq": ["settings", "status"],
+}
+
+EVENT_STATION_STARTED = "station_started"
+EVENT_STATION_STOPPED = "station_stopped"
+EVENT_PROGRAM_STARTED = "program_started"
+EVENT_PROGRAM_STOPPED = "program_stopped"
+EVENT_RAIN_DELAY_CHANGED = "rain_delay_changed"
+EVENT_SENSOR_CHANGED = "sensor_changed"
+EVENT_WATER_LEVEL_CHANGED = "water_level_changed"
+
+# keep request query strings within the firmware request buffer
+MAX_QUERY_LENGTH = 1000
+
+# per bank bit arrays of /jn, bit n of bank b is station 8 * b + n
+STATION_BIT_PROPERTIES = [
+    "masop",
+    "masop2",
+    "ignore_rain",
+    "ignore_sn1",
+    "ignore_sn2",
+    "stn_dis",
+    "stn_seq",
+    "stn_spe",
+    "act_relay",
+]
+
 STATION_TYPE_STANDARD = "standard"
 
 STATION_STATUS_IDLE = "idle"
@@ -57,6 +109,10 @@ START_TIME_SUNSET_BIT = 13
 START_TIME_SUNRISE_BIT = 14
 START_TIME_MINUTES_MASK = 0x7FF
 
+# station durations resolved from today's sunrise and sunset times
+STATION_DURATION_SUNRISE_TO_SUNSET = 65534
+STATION_DURATION_SUNSET_TO_SUNRISE = 65535
+
 WEEKDAYS = [
     "Monday",
     "Tuesday",
@@ -66,3 +122,19 @@ WEEKDAYS = [
     "Saturday",
     "Sunday",
 ]
+
+LOG_TYPE_STATION = "station"
+LOG_TYPE_RAIN_SENSOR = "rain_sensor"
+LOG_TYPE_RAIN_DELAY = "rain_delay"
+LOG_TYPE_WATER_LEVEL = "water_level"
+LOG_TYPE_FLOW_SENSE = "flow_sense"
+LOG_TYPE_SENSOR_1 = "sensor_1"
+LOG_TYPE_SENSOR_2 = "sensor_2"
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+# endpoints safe to send again after a connection error, commands like /cm, /mp or
+# /cr could run twice
+RETRY_PATHS = ["/ja", "/jc", "/jo", "/jn", "/js", "/jp", "/jl", "/co", "/cs"]
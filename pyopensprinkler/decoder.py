@@ -0,0 +1,29 @@
+"""Decoder module selecting the JSON decoder of responses."""
+
+import importlib
+
+# fastest first, json of the standard library is always available
+JSON_DECODERS = ["orjson", "ujson", "json"]
+
+
+def get_json_loads(decoder=None):
+    """
+    Retrieve a function decoding JSON from bytes
+
+    decoder is the name of a module in JSON_DECODERS or a function. By default the
+    first installed module of JSON_DECODERS is used. Decoding errors must be
+    ValueError subclasses, which holds for all of them.
+    """
+    if callable(decoder):
+        return decoder
+
+    if decoder is not None:
+        if decoder not in JSON_DECODERS:
+            raise ValueError(f"Unknown JSON decoder: {decoder}")
+        return importlib.import_module(decoder).loads
+
+    for name in JSON_DECODERS:
+        try:
+            return importlib.import_module(name).loads
+        except ImportError:
+            continue
@@ -0,0 +1,860 @@
+"""Emulator module serving an OpenSprinkler firmware API stand-in."""
+
+import asyncio
+import copy
+import datetime
+import hashlib
+import json
+import random
+import time
+
+from aiohttp import web
+from pyopensprinkler.const import STATION_BIT_PROPERTIES
+from pyopensprinkler.forecast import (
+    EPOCH_ORDINAL,
+    MINUTES_PER_DAY,
+    SECONDS_PER_DAY,
+    _matches_day,
+    _resolve_duration,
+    _start_minutes,
+)
+from pyopensprinkler.program import ProgramSchedule
+
+# firmware result codes
+RESULT_SUCCESS = 1
+RESULT_UNAUTHORIZED = 2
+RESULT_MISMATCH = 3
+RESULT_DATA_MISSING = 16
+RESULT_DATA_OUT_OF_BOUND = 17
+RESULT_DATA_FORMAT_ERROR = 18
+RESULT_PAGE_NOT_FOUND = 32
+RESULT_NOT_PERMITTED = 48
+
+# running program ids of manual and run-once runs
+MANUAL_PROGRAM_ID = 99
+RUN_ONCE_PROGRAM_ID = 254
+
+# queue options of run requests
+QUEUE_APPEND = 0
+QUEUE_INSERT = 1
+QUEUE_REPLACE = 2
+
+MAX_MANUAL_DURATION = 64800
+MAX_PROGRAMS = 40
+MAX_LOG_DAYS = 365
+
+# /cs bank parameters and the station bit property they set
+STATION_BIT_PARAMETERS = {
+    "m": "masop",
+    "n": "masop2",
+    "i": "ignore_rain",
+    "j": "ignore_sn1",
+    "k": "ignore_sn2",
+    "d": "stn_dis",
+    "q": "stn_seq",
+    "p": "stn_spe",
+}
+
+
+class _Entry(object):
+    """Station run waiting or running in the emulated queue."""
+
+    __slots__ = ("pid", "start", "duration")
+
+    def __init__(self, pid, start, duration):
+        """Queue entry initializer."""
+        self.pid = pid
+        self.start = start
+        self.duration = duration
+
+    @property
+    def end(self):
+        return self.start + self.duration
+
+
+class OpenSprinklerEmulator(object):
+    """In-process OpenSprinkler controller answering the firmware HTTP API."""
+
+    def __init__(self, password="opendoor", opts=None):
+        """Emulator initializer."""
+        if opts is None:
+            opts = {}
+
+        if "firmware_version" not in opts:
+            opts["firmware_version"] = 219
+
+        if "firmware_minor" not in opts:
+            opts["firmware_minor"] = 0
+
+        if "boards" not in opts:
+            opts["boards"] = 1
+
+        if "time_zone" not in opts:
+            opts["time_zone"] = 48
+
+        # seconds added to every response, plus up to jitter seconds
+        if "latency" not in opts:
+            opts["latency"] = 0
+
+        if "jitter" not in opts:
+            opts["jitter"] = 0
+
+        # probability of answering a request with an HTTP 500 error page
+        if "failure_rate" not in opts:
+            opts["failure_rate"] = 0
+
+        # forced firmware result code per path, e.g. {"/ja": 32}
+        if "errors" not in opts:
+            opts["errors"] = {}
+
+        if "clock" not in opts:
+            opts["clock"] = time.time
+
+        self._opts = opts
+        self._md5password = hashlib.md5(password.encode("utf-8")).hexdigest()
+        self._random = random.Random(opts.get("seed"))
+        self._runner = None
+        self._url = None
+        self._request_count = 0
+        self._queue = {}
+        self._programs = []
+        self._pause_end = 0
+        self._log = []
+        self._rain_delay_start = 0
+
+        self._build_state()
+        self._last_minute = self._now() // 60
+
+        self._handlers = {
+            "/ja": self._handle_all,
+            "/jc": self._handle_settings,
+            "/jo": self._handle_options,
+            "/jn": self._handle_stations,
+            "/js": self._handle_status,
+            "/jp": self._handle_programs,
+            "/cv": self._handle_change_variables,
+            "/co": self._handle_change_options,
+            "/cs": self._handle_change_stations,
+            "/cm": self._handle_manual_station,
+            "/mp": self._handle_manual_program,
+            "/cp": self._handle_change_program,
+            "/dp": self._handle_delete_program,
+            "/up": self._handle_move_program_up,
+            "/cr": self._handle_run_once,
+            "/pq": self._handle_pause_queue,
+            "/sp": self._handle_set_password,
+            "/jl": self._handle_log,
+        }
+
+    def _build_state(self):
+        firmware = self._opts["firmware_version"]
+        boards = self._opts["boards"]
+        station_count = boards * 8
+
+        self._options = {
+            "fwv": firmware,
+            "fwm": self._opts["firmware_minor"],
+            "tz": self._opts["time_zone"],
+            "hwv": 64,
+            "hwt": 172,
+            "ext": boards - 1,
+            "sdt": 0,
+            "mas": 0,
+            "mton": 0,
+            "mtof": 0,
+            "wl": 100,
+            "den": 1,
+            "ipas": 0,
+            "devid": 0,
+            "ntp": 1,
+            "dhcp": 1,
+            "ip1": 192,
+            "ip2": 168,
+            "ip3": 1,
+            "ip4": 22,
+            "gw1": 192,
+            "gw2": 168,
+            "gw3": 1,
+            "gw4": 1,
+            "hp0": 80,
+            "hp1": 0,
+            "ar": 0,
+            "lg": 1,
+            "uwt": 0,
+            "urs": 0,
+            "rso": 0,
+            "sar": 0,
+            "mas2": 0,
+            "mton2": 0,
+            "mtof2": 0,
+            "fpr0": 100,
+            "fpr1": 0,
+            "re": 0,
+            "reset": 0,
+        }
+        if firmware >= 219:
+            self._options.update(
+                {
+                    "sn1t": 0,
+                    "sn1o": 1,
+                    "sn2t": 0,
+                    "sn2o": 1,
+                    "sn1on": 0,
+                    "sn1of": 0,
+                    "sn2on": 0,
+                    "sn2of": 0,
+                }
+            )
+
+        self._settings = {
+            "nbrd": boards,
+            "en": 1,
+            "rd": 0,
+            "rdst": 0,
+            "sunrise": 360,
+            "sunset": 1080,
+            "eip": 0,
+            "lwc": 0,
+            "lswc": 0,
+            "lrbtc": 0,
+            "lrun": [0, 0, 0, 0],
+            "loc": "",
+            "jsp": "https://ui.opensprinkler.com/js",
+            "wterr": 0,
+            "rs": 0,
+            "sn1": 0,
+            "sn2": 0,
+            "RSSI": -50,
+            "wto": {},
+            "ifkey": "",
+            "curr": 0,
+            "flcrt": 0,
+            "flwrt": 30,
+        }
+        if firmware >= 218:
+            self._settings["lupt"] = self._now()
+        if firmware > 219 or (firmware == 219 and self._opts["firmware_minor"] >= 4):
+            self._settings["mac"] = "00:00:00:00:00:00"
+        if firmware >= 220:
+            self._settings["mqtt"] = {"en": 0}
+            self._settings["pq"] = 0
+            self._settings["pt"] = 0
+
+        if firmware <= 215:
+            maxlen = 16
+        elif firmware <= 218:
+            maxlen = 24
+        else:
+            maxlen = 32
+
+        self._stations = {
+            "snames": [f"S{i + 1:02d}" for i in range(station_count)],
+            "maxlen": maxlen,
+        }
+        for bit_property in STATION_BIT_PROPERTIES:
+            # stations run sequentially by default
+            value = 255 if bit_property == "stn_seq" else 0
+            self._stations[bit_property] = [value] * boards
+        if firmware < 216:
+            del self._stations["stn_spe"]
+        if firmware < 219:
+            del self._stations["ignore_sn1"]
+            del self._stations["ignore_sn2"]
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Start serving, returns the base url of the emulator"""
+        app = web.Application()
+        app.router.add_route("GET", "/{path}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        host, port = self._runner.addresses[0][:2]
+        self._url = f"http://{host}:{port}"
+        return self._url
+
+    async def stop(self):
+        """Stop serving"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def _now(self):
+        """Device local time"""
+        offset = (self._opts["time_zone"] - 48) * 15 * 60
+        return int(self._opts["clock"]()) + offset
+
+    async def _handle(self, request):
+        self._request_count += 1
+        delay = self._opts["latency"] + self._random.uniform(0, self._opts["jitter"])
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self._random.random() < self._opts["failure_rate"]:
+            raise web.HTTPInternalServerError()
+
+        path = "/" + request.match_info["path"]
+        params = request.query
+
+        if path in self._opts["errors"]:
+            return self._result(self._opts["errors"][path])
+
+        handler = self._handlers.get(path)
+        if handler is None:
+            return self._result(RESULT_PAGE_NOT_FOUND)
+
+        if not self._options["ipas"] and params.get("pw") != self._md5password:
+            return self._result(RESULT_UNAUTHORIZED)
+
+        now = self._now()
+        self._advance(now)
+        try:
+            content = handler(params, now)
+        except (KeyError, ValueError, TypeError, IndexError):
+            content = {"result": RESULT_DATA_FORMAT_ERROR}
+        self._advance(now)
+        return web.json_response(content)
+
+    def _result(self, code):
+        return web.json_response({"result": code})
+
+    # state transitions
+    def _advance(self, now):
+        """Bring the controller state up to the current time"""
+        if self._settings["rd"] and self._settings["rdst"] <= now:
+            self._end_rain_delay(self._settings["rdst"])
+
+        if self._settings.get("pq") and self._pause_end <= now:
+            self._settings["pq"] = 0
+            self._settings["pt"] = 0
+
+        # scheduled program starts of every minute since the last request
+        minute = now // 60
+        first = max(self._last_minute + 1, minute - MINUTES_PER_DAY + 1)
+        for start_minute in range(first, minute + 1):
+            self._run_scheduled_programs(start_minute)
+        self._last_minute = max(self._last_minute, minute)
+
+        finished = sorted(self._queue.items(), key=lambda item: item[1].end)
+        for sid, entry in finished:
+            if entry.end <= now:
+                del self._queue[sid]
+                self._settings["lrun"] = [sid, entry.pid, entry.duration, entry.end]
+                self._log.append([entry.pid, sid, entry.duration, entry.end])
+
+    def _end_rain_delay(self, now):
+        self._log.append([0, "rd", now - self._rain_delay_start, now])
+        self._settings["rd"] = 0
+        self._settings["rdst"] = 0
+
+    def _run_scheduled_programs(self, minute):
+        if not self._settings["en"] or self._settings.get("pq"):
+            return
+
+        day, minute_of_day = divmod(minute, MINUTES_PER_DAY)
+        date = datetime.date.fromordinal(EPOCH_ORDINAL + day)
+        sunrise = self._settings["sunrise"]
+        sunset = self._settings["sunset"]
+        ignore_rain = self._station_bits("ignore_rain")
+
+        for pid, data in enumerate(self._programs):
+            schedule = ProgramSchedule(data)
+            if not schedule.enabled or not _matches_day(schedule, day, date):
+                continue
+            if minute_of_day not in _start_minutes(schedule, sunrise, sunset):
+                continue
+
+            runs = []
+            for sid, duration in enumerate(data[4]):
+                if self._settings["rd"] and not ignore_rain >> sid & 1:
+                    continue
+                duration = _resolve_duration(duration, sunrise, sunset)
+                runs.append((sid, pid + 1, duration))
+            self._schedule(
+                runs, minute * 60, QUEUE_APPEND, schedule.use_weather_adjustments
+            )
+
+    def _station_bits(self, bit_property):
+        banks = self._stations.get(bit_property, [])
+        return int.from_bytes(bytes(banks), "little")
+
+    def _is_sequential(self, sid):
+        return bool(self._station_bits("stn_seq") >> sid & 1)
+
+    def _schedule(self, runs, now, qo, uwt=False, preempt=False):
+        """
+        Queue (station, program id, seconds) runs
+
+        Sequential stations run one after another with the station delay, other
+        stations start at once. qo inserts runs ahead of waiting stations, preempt
+        makes them go ahead of running stations as well.
+        """
+        disabled = self._station_bits("stn_dis")
+        masters = [self._options["mas"], self._options["mas2"]]
+        delay = self._options["sdt"]
+
+        if qo == QUEUE_REPLACE:
+            self._queue.clear()
+
+        queued = []
+        for sid, pid, duration in runs:
+            if uwt:
+                duration = duration * self._options["wl"] // 100
+            if sid >= len(self._stations["snames"]) or duration <= 0:
+                continue
+            if disabled >> sid & 1 or sid + 1 in masters or sid in self._queue:
+                continue
+            queued.append((sid, pid, duration))
+
+        sequential = [sid for sid, _, _ in queued if self._is_sequential(sid)]
+        waiting = {
+            sid: entry
+            for sid, entry in self._queue.items()
+            if self._is_sequential(sid) and (preempt or entry.start > now)
+        }
+
+        if qo == QUEUE_INSERT:
+            total = sum(
+                duration + delay
+                for sid, _, duration in queued
+                if self._is_sequential(sid)
+            )
+            for entry in waiting.values():
+                if entry.start <= now:
+                    entry.duration = entry.end - now
+                    entry.start = now
+                entry.start += total
+            others = [
+                entry
+                for sid, entry in self._queue.items()
+                if self._is_sequential(sid) and sid not in waiting
+            ]
+        else:
+            others = [
+                entry for sid, entry in self._queue.items() if self._is_sequential(sid)
+            ]
+        sequence_end = max([now] + [entry.end + delay for entry in others])
+
+        for sid, pid, duration in queued:
+            if sid in sequential:
+                start = sequence_end
+                sequence_end = start + duration + delay
+            else:
+                start = now
+            self._queue[sid] = _Entry(pid, start, duration)
+
+        return len(queued)
+
+    def _unschedule(self, sid, now, shift=False):
+        """Remove a station from the queue, moving up later sequential stations"""
+        entry = self._queue.pop(sid, None)
+        if entry is None or not shift or not self._is_sequential(sid):
+            return
+
+        remaining = entry.end - max(entry.start, now) + self._options["sdt"]
+        for other_sid, other in self._queue.items():
+            if self._is_sequential(other_sid) and other.start >= entry.start:
+                other.start = max(now, other.start - remaining)
+
+    # state parts
+    def _get_settings(self, now):
+        settings = dict(self._settings)
+        station_count = len(self._stations["snames"])
+        status = self._get_station_status(now)
+
+        settings["devt"] = now
+        settings["ps"] = [
+            (
+                [entry.pid, entry.end - max(entry.start, now), entry.start]
+                if entry is not None
+                else [0, 0, 0]
+            )
+            for entry in (self._queue.get(sid) for sid in range(station_count))
+        ]
+        settings["sbits"] = [
+            sum(status[bank * 8 + i] << i for i in range(8))
+            for bank in range(self._settings["nbrd"])
+        ] + [0]
+        if settings.get("pq"):
+            settings["pt"] = max(self._pause_end - now, 0)
+        return settings
+
+    def _get_station_status(self, now):
+        station_count = len(self._stations["snames"])
+        status = [0] * station_count
+        for sid, entry in self._queue.items():
+            if entry.start <= now < entry.end and not self._settings.get("pq"):
+                status[sid] = 1
+
+        for master, bit_property in [
+            (self._options["mas"], "masop"),
+            (self._options["mas2"], "masop2"),
+        ]:
+            if 0 < master <= station_count:
+                bits = self._station_bits(bit_property)
+                status[master - 1] = int(
+                    any(on and bits >> sid & 1 for sid, on in enumerate(status))
+                )
+        return status
+
+    def _get_status(self, now):
+        status = self._get_station_status(now)
+        return {"sn": status, "nstations": len(status)}
+
+    def _get_programs(self):
+        return {
+            "nprogs": len(self._programs),
+            "nboards": self._settings["nbrd"],
+            "mnp": MAX_PROGRAMS,
+            "mnst": 4,
+            "pnsize": 32,
+            "pd": copy.deepcopy(self._programs),
+        }
+
+    def get_state(self):
+        """Return the full state as served by /ja"""
+        now = self._now()
+        self._advance(now)
+        return self._get_all(now)
+
+    def _get_all(self, now):
+        return {
+            "settings": self._get_settings(now),
+            "programs": self._get_programs(),
+            "options": dict(self._options),
+            "status": self._get_status(now),
+            "stations": copy.deepcopy(self._stations),
+        }
+
+    # handlers
+    def _handle_all(self, params, now):
+        if self._opts["firmware_version"] < 216:
+            return {"result": RESULT_PAGE_NOT_FOUND}
+        return self._get_all(now)
+
+    def _handle_settings(self, params, now):
+        return self._get_settings(now)
+
+    def _handle_options(self, params, now):
+        return dict(self._options)
+
+    def _handle_stations(self, params, now):
+        return copy.deepcopy(self._stations)
+
+    def _handle_status(self, params, now):
+        return self._get_status(now)
+
+    def _handle_programs(self, params, now):
+        return self._get_programs()
+
+    def _handle_change_variables(self, params, now):
+        if "rsn" in params and int(params["rsn"]):
+            self._queue.clear()
+
+        if "en" in params:
+            self._settings["en"] = int(bool(int(params["en"])))
+            if not self._settings["en"]:
+                self._queue.clear()
+
+        if "rd" in params:
+            hours = int(params["rd"])
+            if hours < 0 or hours > 32767:
+                return {"result": RESULT_DATA_OUT_OF_BOUND}
+            if self._settings["rd"]:
+                self._end_rain_delay(now)
+            if hours > 0:
+                self._rain_delay_start = now
+                self._settings["rd"] = 1
+                self._settings["rdst"] = now + hours * 3600
+
+        if "re" in params:
+            self._options["re"] = int(bool(int(params["re"])))
+
+        if "rbt" in params and int(params["rbt"]):
+            self._queue.clear()
+            if "lupt" in self._settings:
+                self._settings["lupt"] = now
+
+        return {"result": RESULT_SUCCESS}
+
+    def _handle_change_options(self, params, now):
+        water_level = self._options["wl"]
+        for key, value in params.items():
+            if key == "pw":
+                continue
+            if key == "loc":
+                self._settings["loc"] = value
+            elif key == "wto":
+                self._settings["wto"] = json.loads("{" + value + "}")
+            elif key == "o23":
+                self._options["wl"] = int(value)
+            elif key in self._options:
+                self._options[key] = int(value)
+
+        if not 0 <= self._options["wl"] <= 250:
+            self._options["wl"] = min(max(self._options["wl"], 0), 250)
+            return {"result": RESULT_DATA_OUT_OF_BOUND}
+
+        if self._options["wl"] != water_level:
+            self._log.append([0, "wl", self._options["wl"], now])
+        return {"result": RESULT_SUCCESS}
+
+    def _handle_change_stations(self, params, now):
+        station_count = len(self._stations["snames"])
+        boards = self._settings["nbrd"]
+
+        for key, value in params.items():
+            if key == "pw":
+                continue
+            prefix, index = key[0], key[1:]
+            if not index.isdigit():
+                continue
+            index = int(index)
+
+            if prefix == "s":
+                if index >= station_count:
+                    return {"result": RESULT_DATA_OUT_OF_BOUND}
+                self._stations["snames"][index] = value[: self._stations["maxlen"]]
+            elif prefix in STATION_BIT_PARAMETERS:
+                bit_property = STATION_BIT_PARAMETERS[prefix]
+                if bit_property not in self._stations or index >= boards:
+                    continue
+                self._stations[bit_property][index] = int(value) & 0xFF
+
+        # disabled stations stop running
+        disabled = self._station_bits("stn_dis")
+        for sid in list(self._queue):
+            if disabled >> sid & 1:
+                self._unschedule(sid, now)
+
+        return {"result": RESULT_SUCCESS}
+
+    def _get_queue_option(self, params, default):
+        if "qo" not in params or self._opts["firmware_version"] < 221:
+            return default
+        qo = int(params["qo"])
+        if qo not in (QUEUE_APPEND, QUEUE_INSERT, QUEUE_REPLACE):
+            raise ValueError("unknown queue option")
+        return qo
+
+    def _handle_manual_station(self, params, now):
+        if "sid" not in params or "en" not in params:
+            return {"result": RESULT_DATA_MISSING}
+
+        sid = int(params["sid"])
+        if not 0 <= sid < len(self._stations["snames"]):
+            return {"result": RESULT_DATA_OUT_OF_BOUND}
+
+        if not int(params["en"]):
+            shift = "ssta" in params and bool(int(params["ssta"]))
+            self._unschedule(sid, now, shift)
+            return {"result": RESULT_SUCCESS}
+
+        if "t" not in params:
+            return {"result": RESULT_DATA_MISSING}
+        duration = int(params["t"])
+        if not 0 < duration <= MAX_MANUAL_DURATION:
+            return {"result": RESULT_DATA_OUT_OF_BOUND}
+        if sid in self._queue or self._station_bits("stn_dis") >> sid & 1:
+            return {"result": RESULT_NOT_PERMITTED}
+
+        qo = self._get_queue_option(params, QUEUE_APPEND)
+        self._schedule([(sid, MANUAL_PROGRAM_ID, duration)], now, qo, preempt=True)
+        return {"result": RESULT_SUCCESS}
+
+    def _handle_manual_program(self, params, now):
+        if "pid" not in params:
+            return {"result": RESULT_DATA_MISSING}
+
+        pid = int(params["pid"])
+        if not 0 <= pid < len(self._programs):
+            return {"result": RESULT_DATA_OUT_OF_BOUND}
+
+        uwt = "uwt" in params and bool(int(params["uwt"]))
+        qo = self._get_queue_option(params, QUEUE_REPLACE)
+        sunrise = self._settings["sunrise"]
+        sunset = self._settings["sunset"]
+        runs = [
+            (sid, pid + 1, _resolve_duration(duration, sunrise, sunset))
+            for sid, duration in enumerate(self._programs[pid][4])
+        ]
+        self._schedule(runs, now, qo, uwt)
+        return {"result": RESULT_SUCCESS}
+
+    def _handle_run_once(self, params, now):
+        if "t" not in params:
+            return {"result": RESULT_DATA_MISSING}
+
+        durations = json.loads(params["t"])
+        if not isinstance(durations, list):
+            return {"result": RESULT_DATA_FORMAT_ERROR}
+
+        uwt = "uwt" in params and bool(int(params["uwt"]))
+        qo = self._get_queue_option(params, QUEUE_REPLACE)
+        runs = [
+            (sid, RUN_ONCE_PROGRAM_ID, int(duration))
+            for sid, duration in enumerate(durations)
+        ]
+        self._schedule(runs, now, qo, uwt)
+        return {"result": RESULT_SUCCESS}
+
+    def _handle_change_program(self, params, now):
+        if "pid" not in params:
+            return {"result": RESULT_DATA_MISSING}
+
+        pid = int(params["pid"])
+        if pid < -1 or pid >= len(self._programs):
+            return {"result": RESULT_DATA_OUT_OF_BOUND}
+
+        # enable and weather adjustment flags can be changed on their own
+        if "v" not in params and pid >= 0 and ("en" in params or "uwt" in params):
+            flag = self._programs[pid][0]
+            for key, bit in [("en", 0), ("uwt", 1)]:
+                if key in params:
+                    if int(params[key]):
+                        flag |= 1 << bit
+                    else:
+                        flag &= ~(1 << bit)
+            self._programs[pid][0] = flag
+            return {"result": RESULT_SUCCESS}
+
+        if "v" not in params:
+            return {"result": RESULT_DATA_MISSING}
+
+        data = json.loads(params["v"])
+        if not isinstance(data, list) or len(data) < 5 or len(data[3]) != 4:
+            return {"result": RESULT_DATA_FORMAT_ERROR}
+
+        station_count = len(self._stations["snames"])
+        durations = [int(duration) for duration in data[4][:station_count]]
+        durations += [0] * (station_count - len(durations))
+        if any(not 0 <= duration <= 65535 for duration in durations):
+            return {"result": RESULT_DATA_OUT_OF_BOUND}
+
+        name = params.get("name", "")
+        program = [
+            int(data[0]),
+            int(data[1]),
+            int(data[2]),
+            [int(start_time) for start_time in data[3]],
+            durations,
+            name[:32],
+        ]
+
+        if pid == -1:
+            if len(self._programs) >= MAX_PROGRAMS:
+                return {"result": RESULT_DATA_OUT_OF_BOUND}
+            self._programs.append(program)
+        else:
+            self._programs[pid] = program
+        return {"result": RESULT_SUCCESS}
+
+    def _handle_delete_program(self, params, now):
+        if "pid" not in params:
+            return {"result": RESULT_DATA_MISSING}
+
+        pid = int(params["pid"])
+        if pid == -1:
+            self._programs = []
+        elif 0 <= pid < len(self._programs):
+            del self._programs[pid]
+        else:
+            return {"result": RESULT_DATA_OUT_OF_BOUND}
+        return {"result": RESULT_SUCCESS}
+
+    def _handle_move_program_up(self, params, now):
+        if "pid" not in params:
+            return {"result": RESULT_DATA_MISSING}
+
+        pid = int(params["pid"])
+        if not 1 <= pid < len(self._programs):
+            return {"result": RESULT_DATA_OUT_OF_BOUND}
+        programs = self._programs
+        programs[pid - 1], programs[pid] = programs[pid], programs[pid - 1]
+        return {"result": RESULT_SUCCESS}
+
+    def _handle_pause_queue(self, params, now):
+        if self._opts["firmware_version"] < 220:
+            return {"result": RESULT_PAGE_NOT_FOUND}
+        if "dur" not in params:
+            return {"result": RESULT_DATA_MISSING}
+
+        duration = int(params["dur"])
+        if duration < 0:
+            return {"result": RESULT_DATA_OUT_OF_BOUND}
+
+        if self._settings["pq"]:
+            # resuming moves the queue back by the pause time left
+            remaining = max(self._pause_end - now, 0)
+            for entry in self._queue.values():
+                entry.start = max(now, entry.start - remaining)
+            self._settings["pq"] = 0
+            self._settings["pt"] = 0
+            self._pause_end = 0
+
+        if duration > 0:
+            # paused stations keep their remaining time
+            for entry in self._queue.values():
+                if entry.start <= now:
+                    entry.duration = entry.end - now
+                    entry.start = now
+                entry.start += duration
+            self._settings["pq"] = 1
+            self._settings["pt"] = duration
+            self._pause_end = now + duration
+
+        return {"result": RESULT_SUCCESS}
+
+    def _handle_log(self, params, now):
+        if "hist" in params:
+            # days before today
+            end = (now // SECONDS_PER_DAY + 1) * SECONDS_PER_DAY - 1
+            start = end + 1 - (int(params["hist"]) + 1) * SECONDS_PER_DAY
+        elif "start" in params and "end" in params:
+            start = int(params["start"])
+            end = int(params["end"])
+        else:
+            return {"result": RESULT_DATA_MISSING}
+
+        if end < start or end - start > MAX_LOG_DAYS * SECONDS_PER_DAY:
+            return {"result": RESULT_DATA_OUT_OF_BOUND}
+
+        record_type = params.get("type")
+        return [
+            record
+            for record in self._log
+            if start <= record[3] <= end
+            and (record_type is None or record[1] == record_type)
+        ]
+
+    def _handle_set_password(self, params, now):
+        if "npw" not in params or "cpw" not in params:
+            return {"result": RESULT_DATA_MISSING}
+        if params["npw"] != params["cpw"]:
+            return {"result": RESULT_MISMATCH}
+
+        self._md5password = params["npw"]
+        return {"result": RESULT_SUCCESS}
+
+    @property
+    def url(self):
+        """Return base url, None until started"""
+        return self._url
+
+    @property
+    def request_count(self):
+        """Number of requests received"""
+        return self._request_count
+
+    @property
+    def opts(self):
+        """Return emulator options, latency, jitter and failures can be changed live"""
+        return self._opts
@@ -0,0 +1,110 @@
+"""Events module computing changes between controller states."""
+
+from pyopensprinkler.const import (
+    EVENT_PROGRAM_STARTED,
+    EVENT_PROGRAM_STOPPED,
+    EVENT_RAIN_DELAY_CHANGED,
+    EVENT_SENSOR_CHANGED,
+    EVENT_STATION_STARTED,
+    EVENT_STATION_STOPPED,
+    EVENT_WATER_LEVEL_CHANGED,
+)
+
+# program ids of manual and run-once runs, not actual programs
+MANUAL_PROGRAM_IDS = (99, 254)
+
+
+class ControllerEvent(object):
+    """Change between two consecutive controller states."""
+
+    __slots__ = ("type", "index", "old", "new")
+
+    def __init__(self, event_type, index=None, old=None, new=None):
+        """Controller event initializer."""
+        self.type = event_type
+        self.index = index
+        self.old = old
+        self.new = new
+
+    def __eq__(self, other):
+        if not isinstance(other, ControllerEvent):
+            return NotImplemented
+        return (self.type, self.index, self.old, self.new) == (
+            other.type,
+            other.index,
+            other.old,
+            other.new,
+        )
+
+    def __repr__(self):
+        return (
+            f"ControllerEvent(type={self.type!r}, index={self.index!r}, "
+            f"old={self.old!r}, new={self.new!r})"
+        )
+
+
+def _running_programs(state):
+    """Retrieve 0 indexed ids of programs with a running station"""
+    running = set()
+    for is_running, status in zip(state["status"]["sn"], state["settings"]["ps"]):
+        pid = status[0]
+        if is_running and pid > 0 and pid not in MANUAL_PROGRAM_IDS:
+            running.add(pid - 1)
+    return running
+
+
+def _sensor_value(settings, sensor):
+    if sensor == 1 and "sn1" not in settings:
+        # rain sensor of firmware without sensor 2
+        return settings.get("rs")
+    return settings.get(f"sn{sensor}")
+
+
+def diff_states(old, new):
+    """Compute the events between two controller states, in a stable order"""
+    events = []
+
+    old_sn = old["status"]["sn"]
+    new_sn = new["status"]["sn"]
+    old_ps = old["settings"]["ps"]
+    new_ps = new["settings"]["ps"]
+
+    if old_sn != new_sn:
+        for index, (was_running, is_running) in enumerate(zip(old_sn, new_sn)):
+            if was_running == is_running:
+                continue
+            event_type = EVENT_STATION_STARTED if is_running else EVENT_STATION_STOPPED
+            events.append(
+                ControllerEvent(event_type, index, old_ps[index][0], new_ps[index][0])
+            )
+
+    if old_sn != new_sn or old_ps != new_ps:
+        old_programs = _running_programs(old)
+        new_programs = _running_programs(new)
+        for index in sorted(new_programs - old_programs):
+            events.append(ControllerEvent(EVENT_PROGRAM_STARTED, index))
+        for index in sorted(old_programs - new_programs):
+            events.append(ControllerEvent(EVENT_PROGRAM_STOPPED, index))
+
+    old_settings = old["settings"]
+    new_settings = new["settings"]
+
+    old_rd = bool(old_settings.get("rd"))
+    new_rd = bool(new_settings.get("rd"))
+    if old_rd != new_rd:
+        events.append(ControllerEvent(EVENT_RAIN_DELAY_CHANGED, None, old_rd, new_rd))
+
+    for sensor in (1, 2):
+        old_value = _sensor_value(old_settings, sensor)
+        new_value = _sensor_value(new_settings, sensor)
+        if old_value != new_value:
+            events.append(
+                ControllerEvent(EVENT_SENSOR_CHANGED, sensor, old_value, new_value)
+            )
+
+    old_wl = old["options"].get("wl")
+    new_wl = new["options"].get("wl")
+    if old_wl != new_wl:
+        events.append(ControllerEvent(EVENT_WATER_LEVEL_CHANGED, None, old_wl, new_wl))
+
+    return events
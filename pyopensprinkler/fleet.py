@@ -0,0 +1,186 @@
+"""Fleet module handling many controllers at once."""
+
+import asyncio
+
+import aiohttp
+from pyopensprinkler import Controller, OpenSprinklerCircuitOpenError
+
+
+class FleetResult(object):
+    """Per controller results and errors of a fleet operation."""
+
+    def __init__(self):
+        """Fleet result initializer."""
+        self.results = {}
+        self.errors = {}
+        self.skipped = []
+
+    @property
+    def ok(self):
+        """Return True if the operation succeeded on every controller"""
+        return not self.errors
+
+
+class ControllerFleet(object):
+    """Fleet of controllers sharing one HTTP connection pool."""
+
+    def __init__(self, opts=None):
+        """Controller fleet initializer."""
+        if opts is None:
+            opts = {}
+
+        # global number of requests in flight across the fleet
+        if "limit" not in opts:
+            opts["limit"] = 32
+
+        # connections per controller host
+        if "limit_per_host" not in opts:
+            opts["limit_per_host"] = 1
+
+        if "dns_cache_ttl" not in opts:
+            opts["dns_cache_ttl"] = 300
+
+        if "keepalive_timeout" not in opts:
+            opts["keepalive_timeout"] = 60
+
+        self._opts = opts
+        self._controllers = {}
+        self._http_client = None
+        self._semaphore = None
+
+    def add(self, url, password, opts=None, key=None):
+        """Add a controller, identified by key or its url"""
+        if key is None:
+            key = url
+
+        if key in self._controllers:
+            raise ValueError(f"Controller already in fleet: {key}")
+
+        opts = dict(opts) if opts is not None else {}
+        if "hooks" in self._opts and "hooks" not in opts:
+            opts["hooks"] = self._opts["hooks"]
+        controller = Controller(url, password, opts)
+        if self._http_client is not None:
+            self._attach(controller)
+
+        self._controllers[key] = controller
+        return controller
+
+    def remove(self, key):
+        """Remove a controller"""
+        return self._controllers.pop(key)
+
+    def _attach(self, controller):
+        """Make a controller use the fleet session"""
+        controller._opts["session"] = self._http_client
+        controller._http_client = self._http_client
+
+    def session_start(self):
+        connector = aiohttp.TCPConnector(
+            limit=self._opts["limit"],
+            limit_per_host=self._opts["limit_per_host"],
+            ttl_dns_cache=self._opts["dns_cache_ttl"],
+            keepalive_timeout=self._opts["keepalive_timeout"],
+        )
+        self._http_client = aiohttp.ClientSession(
+            connector=connector, cookie_jar=aiohttp.DummyCookieJar()
+        )
+        self._semaphore = asyncio.Semaphore(self._opts["limit"])
+
+        for controller in self._controllers.values():
+            self._attach(controller)
+
+    async def session_close(self):
+        for controller in self._controllers.values():
+            await controller.session_close()
+
+        if self._http_client is not None:
+            await self._http_client.close()
+            self._http_client = None
+
+    async def _run_one(self, controller, operation):
+        async with self._semaphore:
+            return await operation(controller)
+
+    async def run(self, operation, keys=None):
+        """
+        Run operation concurrently on controllers
+
+        operation is called with each controller and must return an awaitable. Runs on
+        all controllers unless keys are given. Controllers with an open circuit
+        breaker are skipped, with an OpenSprinklerCircuitOpenError as error.
+        """
+        if self._http_client is None:
+            self.session_start()
+
+        if keys is None:
+            keys = list(self._controllers)
+
+        result = FleetResult()
+        reachable = []
+        for key in keys:
+            breaker = self._controllers[key].circuit_breaker
+            if breaker is not None and breaker.retry_after > 0:
+                result.skipped.append(key)
+                result.errors[key] = OpenSprinklerCircuitOpenError(
+                    "Controller unreachable"
+                )
+            else:
+                reachable.append(key)
+
+        responses = await asyncio.gather(
+            *[self._run_one(self._controllers[key], operation) for key in reachable],
+            return_exceptions=True,
+        )
+
+        for key, response in zip(reachable, responses):
+            if isinstance(response, asyncio.CancelledError):
+                raise response
+            if isinstance(response, Exception):
+                result.errors[key] = response
+            else:
+                result.results[key] = response
+
+        return result
+
+    async def refresh(self, parts=None):
+        """Refresh all controllers"""
+        return await self.run(lambda controller: controller.refresh(parts))
+
+    async def stop_all_stations(self):
+        """Stop all running and waiting stations on all controllers"""
+        return await self.run(lambda controller: controller.stop_all_stations())
+
+    async def set_rain_delay(self, hours):
+        """Set rain delay time (in hours) on all controllers"""
+        return await self.run(lambda controller: controller.set_rain_delay(hours))
+
+    async def disable_rain_delay(self):
+        return await self.run(lambda controller: controller.disable_rain_delay())
+
+    async def set_water_level(self, level):
+        """Set water level (i.e. % Watering) on all controllers"""
+        return await self.run(lambda controller: controller.set_water_level(level))
+
+    def start_polling(self):
+        """
+        Poll every controller in the background at its own adaptive interval
+
+        Requests share the fleet connection pool and its limits, idle controllers are
+        polled at the slow interval of their polling option.
+        """
+        if self._http_client is None:
+            self.session_start()
+
+        for controller in self._controllers.values():
+            controller.start_polling()
+
+    async def stop_polling(self):
+        """Stop polling every controller"""
+        for controller in self._controllers.values():
+            await controller.stop_polling()
+
+    @property
+    def controllers(self):
+        """Return controllers"""
+        return self._controllers
@@ -0,0 +1,256 @@
+"""Forecast module expanding program schedules into station runs."""
+
+import datetime
+
+from pyopensprinkler.const import (
+    START_TIME_MINUTES_MASK,
+    START_TIME_SIGN_BIT,
+    START_TIME_SUNRISE_BIT,
+    START_TIME_SUNSET_BIT,
+    STATION_DURATION_SUNRISE_TO_SUNSET,
+    STATION_DURATION_SUNSET_TO_SUNRISE,
+)
+from pyopensprinkler.program import ProgramSchedule
+from pyopensprinkler.station import _decode_station_bits
+
+SECONDS_PER_DAY = 86400
+MINUTES_PER_DAY = 1440
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+class ForecastRun(object):
+    """Station run expected from program schedules."""
+
+    __slots__ = ("start", "end", "station_index", "program_index")
+
+    def __init__(self, start, end, station_index, program_index):
+        """Forecast run initializer."""
+        self.start = start
+        self.end = end
+        self.station_index = station_index
+        self.program_index = program_index
+
+    @property
+    def duration(self):
+        """Run duration in seconds"""
+        return self.end - self.start
+
+    @property
+    def is_master(self):
+        """Return True for master station runs, which belong to no program"""
+        return self.program_index is None
+
+    def __eq__(self, other):
+        if not isinstance(other, ForecastRun):
+            return NotImplemented
+        return (self.start, self.end, self.station_index, self.program_index) == (
+            other.start,
+            other.end,
+            other.station_index,
+            other.program_index,
+        )
+
+    def __repr__(self):
+        return (
+            f"ForecastRun(start={self.start}, end={self.end}, "
+            f"station_index={self.station_index}, program_index={self.program_index})"
+        )
+
+
+def _to_timestamp(value):
+    """Convert a datetime or timestamp into a UTC timestamp"""
+    if isinstance(value, datetime.datetime):
+        return int(value.timestamp())
+    return int(value)
+
+
+def _start_minutes(schedule, sunrise, sunset):
+    """Retrieve start times of a schedule in minutes from midnight"""
+    starts = []
+    for start_index, start_time in enumerate(schedule.start_times):
+        if start_time == -1:
+            continue
+        # start1-3 are repeat count and interval of repeating schedules
+        if start_index > 0 and schedule.start_time_type == 0:
+            break
+
+        if start_time & 1 << START_TIME_SUNSET_BIT:
+            base = sunset
+        elif start_time & 1 << START_TIME_SUNRISE_BIT:
+            base = sunrise
+        else:
+            starts.append(start_time)
+            continue
+
+        sign = -1 if start_time & 1 << START_TIME_SIGN_BIT else 1
+        starts.append(base + (start_time & START_TIME_MINUTES_MASK) * sign)
+
+    if schedule.start_time_type == 0 and starts:
+        repeat_count = schedule.start_times[1]
+        repeat_interval = schedule.start_times[2]
+        if repeat_interval > 0:
+            first = starts[0]
+            starts = [first + i * repeat_interval for i in range(repeat_count + 1)]
+
+    return sorted(start for start in set(starts) if 0 <= start < MINUTES_PER_DAY)
+
+
+def _resolve_duration(duration, sunrise, sunset):
+    """Resolve special station durations into seconds"""
+    if duration == STATION_DURATION_SUNRISE_TO_SUNSET:
+        return max(sunset - sunrise, 0) * 60
+    if duration == STATION_DURATION_SUNSET_TO_SUNRISE:
+        return (MINUTES_PER_DAY - sunset + sunrise) * 60
+    return duration
+
+
+def _matches_day(schedule, day, date):
+    """Return True if the schedule runs on a day (days since epoch, device local)"""
+    if schedule.program_schedule_type == 0:
+        # epoch day 0 is a Thursday, bit 0 is Monday
+        if not schedule.days0 >> (day + 3) % 7 & 1:
+            return False
+    elif schedule.program_schedule_type == 3:
+        if schedule.days1 < 1 or day % schedule.days1 != schedule.days0:
+            return False
+    else:
+        return False
+
+    if schedule.odd_even_restriction == 1:
+        # odd days, 31st and February 29th are skipped
+        if date.day % 2 == 0 or date.day == 31 or (date.month == 2 and date.day == 29):
+            return False
+    elif schedule.odd_even_restriction == 2:
+        if date.day % 2 == 1:
+            return False
+
+    return True
+
+
+def _merge_intervals(intervals):
+    """Merge overlapping (start, end) intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def forecast_state(state, start, end):
+    """
+    Expand program schedules of a controller state into station runs
+
+    Returns the ForecastRun list overlapping start to end (datetimes or UTC timestamps),
+    sorted by start time, with UTC timestamps. Disabled programs and stations are
+    skipped, sequential stations are queued with the station delay, durations of
+    programs using weather adjustments are scaled by the water level and master
+    stations get runs covering their stations with the on/off adjustments.
+    Today's sunrise and sunset times are used for every day.
+    """
+    start = _to_timestamp(start)
+    end = _to_timestamp(end)
+
+    options = state["options"]
+    settings = state["settings"]
+    stations = state["stations"]
+    bits = _decode_station_bits(state)
+
+    offset = (options.get("tz", 48) - 48) * 15 * 60
+    sunrise = settings.get("sunrise", 360)
+    sunset = settings.get("sunset", 1080)
+    water_level = options.get("wl", 100)
+    station_delay = options.get("sdt", 0)
+    station_count = len(stations["snames"])
+
+    masters = [options.get("mas", 0), options.get("mas2", 0)]
+    master_adjustments = [
+        (options.get("mton", 0), options.get("mtof", 0)),
+        (options.get("mton2", 0), options.get("mtof2", 0)),
+    ]
+    master_bits = [bits.get("masop", 0), bits.get("masop2", 0)]
+
+    disabled = bits.get("stn_dis", 0)
+    if "stn_grp" in stations:
+        # group 255 runs in parallel
+        groups = [None if group == 255 else group for group in stations["stn_grp"]]
+    else:
+        sequential = bits.get("stn_seq", 0)
+        groups = [0 if sequential >> i & 1 else None for i in range(station_count)]
+
+    # per program: schedule, start minutes and (station, seconds) to run
+    programs = []
+    for pid, data in enumerate(state["programs"]["pd"]):
+        schedule = ProgramSchedule(data)
+        if not schedule.enabled:
+            continue
+
+        runs = []
+        for sid, duration in enumerate(data[4][:station_count]):
+            if disabled >> sid & 1 or sid + 1 in masters:
+                continue
+            duration = _resolve_duration(duration, sunrise, sunset)
+            if schedule.use_weather_adjustments:
+                duration = duration * water_level // 100
+            if duration > 0:
+                runs.append((sid, duration))
+
+        starts = _start_minutes(schedule, sunrise, sunset)
+        if runs and starts:
+            programs.append((pid, schedule, starts, runs))
+
+    # expand start events in device local time, from the day before to seed the queues
+    local_start = start + offset
+    local_end = end + offset
+    events = []
+    for day in range(
+        local_start // SECONDS_PER_DAY - 1, local_end // SECONDS_PER_DAY + 1
+    ):
+        date = datetime.date.fromordinal(EPOCH_ORDINAL + day)
+        midnight = day * SECONDS_PER_DAY
+        for pid, schedule, starts, runs in programs:
+            if _matches_day(schedule, day, date):
+                for minute in starts:
+                    events.append((midnight + minute * 60, pid, runs))
+    events.sort(key=lambda event: (event[0], event[1]))
+
+    queue_end = {}
+    busy_until = [0] * station_count
+    expanded = []
+    for time, pid, runs in events:
+        for sid, duration in runs:
+            # a station still queued or running is not scheduled again
+            if busy_until[sid] > time:
+                continue
+
+            group = groups[sid]
+            run_start = time
+            if group is not None:
+                run_start = max(time, queue_end.get(group, 0))
+                queue_end[group] = run_start + duration + station_delay
+
+            busy_until[sid] = run_start + duration
+            expanded.append((run_start, run_start + duration, sid, pid))
+
+    for master, (time_on, time_off), masop in zip(
+        masters, master_adjustments, master_bits
+    ):
+        if master == 0:
+            continue
+        intervals = [
+            (run_start + time_on, run_end + time_off)
+            for run_start, run_end, sid, _ in expanded
+            if masop >> sid & 1
+        ]
+        for run_start, run_end in _merge_intervals(intervals):
+            if run_end > run_start:
+                expanded.append((run_start, run_end, master - 1, None))
+
+    expanded.sort(key=lambda run: (run[0], run[2]))
+    return [
+        ForecastRun(run_start - offset, run_end - offset, sid, pid)
+        for run_start, run_end, sid, pid in expanded
+        if run_end - offset > start and run_start - offset < end
+    ]
@@ -0,0 +1,128 @@
+"""Log module reading the controller watering log."""
+
+import hashlib
+import json
+import os
+
+from pyopensprinkler.const import (
+    LOG_TYPE_FLOW_SENSE,
+    LOG_TYPE_RAIN_DELAY,
+    LOG_TYPE_RAIN_SENSOR,
+    LOG_TYPE_SENSOR_1,
+    LOG_TYPE_SENSOR_2,
+    LOG_TYPE_STATION,
+    LOG_TYPE_WATER_LEVEL,
+)
+
+# record types of /jl, station runs have a station index instead
+LOG_RECORD_TYPES = {
+    "rs": LOG_TYPE_RAIN_SENSOR,
+    "rd": LOG_TYPE_RAIN_DELAY,
+    "wl": LOG_TYPE_WATER_LEVEL,
+    "fl": LOG_TYPE_FLOW_SENSE,
+    "s1": LOG_TYPE_SENSOR_1,
+    "s2": LOG_TYPE_SENSOR_2,
+}
+
+
+class LogRecord(object):
+    """Watering log record."""
+
+    __slots__ = ("type", "end", "duration", "station_index", "program_id", "value")
+
+    def __init__(
+        self, type, end, duration=None, station_index=None, program_id=None, value=None
+    ):
+        """Log record initializer."""
+        self.type = type
+        self.end = end
+        self.duration = duration
+        self.station_index = station_index
+        self.program_id = program_id
+        self.value = value
+
+    @property
+    def start(self):
+        """Start time of records with a duration"""
+        if self.duration is None:
+            return None
+        return self.end - self.duration
+
+    def __eq__(self, other):
+        if not isinstance(other, LogRecord):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"LogRecord({fields})"
+
+
+def parse_record(record, utc_offset=0):
+    """
+    Parse a /jl record into a LogRecord with a UTC end time
+
+    Station runs are [program id, station index, duration, end] with the flow
+    rate as optional fifth value, other records are [0, type, value, end].
+    """
+    pid, kind, value, end = record[:4]
+    end -= utc_offset
+
+    if not isinstance(kind, str):
+        flow = record[4] if len(record) > 4 else None
+        return LogRecord(LOG_TYPE_STATION, end, value, kind, pid, flow)
+
+    record_type = LOG_RECORD_TYPES.get(kind, kind)
+    if record_type in (LOG_TYPE_WATER_LEVEL, LOG_TYPE_FLOW_SENSE):
+        return LogRecord(record_type, end, value=value)
+    return LogRecord(record_type, end, value)
+
+
+class LogCache(object):
+    """Raw /jl records of completed days, kept in memory and optionally on disk."""
+
+    def __init__(self, directory=None, key=""):
+        """Log cache initializer."""
+        self._days = {}
+        self._directory = None
+        if directory is not None:
+            # one directory per controller
+            digest = hashlib.md5(key.encode("utf-8")).hexdigest()
+            self._directory = os.path.join(directory, digest)
+
+    def _path(self, day):
+        return os.path.join(self._directory, f"{day}.json")
+
+    def get(self, day):
+        """Retrieve records of a day (days since epoch, device local), or None"""
+        records = self._days.get(day)
+        if records is not None or self._directory is None:
+            return records
+
+        try:
+            with open(self._path(day)) as file:
+                records = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        self._days[day] = records
+        return records
+
+    def set(self, day, records):
+        """Store records of a completed day"""
+        self._days[day] = records
+        if self._directory is None:
+            return
+
+        os.makedirs(self._directory, exist_ok=True)
+        path = self._path(day)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(records, file, separators=(",", ":"))
+        os.replace(temporary, path)
+
+    def clear(self):
+        """Forget records kept in memory"""
+        self._days = {}
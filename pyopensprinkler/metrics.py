@@ -0,0 +1,200 @@
+"""Metrics module with request hooks and a Prometheus text exporter."""
+
+import asyncio
+
+# latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class RequestHooks(object):
+    """
+    Base class of request hooks, every callback does nothing by default
+
+    Hooks are given to controllers with opts["hooks"] and called with the
+    controller, the request path (e.g. "/ja") and timings in seconds.
+    """
+
+    def request_finished(self, controller, path, elapsed, size, decode_time):
+        """Called after a response was received and decoded"""
+
+    def request_failed(self, controller, path, elapsed, exc):
+        """Called when a request attempt failed, including timeouts"""
+
+    def request_retried(self, controller, path, tries, wait, exc):
+        """Called before a failed request is retried after wait seconds"""
+
+    def refresh_finished(self, controller, parts, elapsed):
+        """Called after a state refresh, parts is None for a full refresh"""
+
+    def auto_refresh_started(self, controller, parts, settle_time):
+        """Called when updates settled for settle_time seconds and refresh"""
+
+
+class Histogram(object):
+    """Cumulative histogram of observed values."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Histogram initializer."""
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class EndpointMetrics(object):
+    """Request metrics of one controller endpoint."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Endpoint metrics initializer."""
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.bytes = 0
+        self.latency = Histogram(buckets)
+        self.decode_time = Histogram(buckets)
+
+
+class ControllerMetrics(object):
+    """Refresh metrics of one controller."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Controller metrics initializer."""
+        self.refreshes = 0
+        self.auto_refreshes = 0
+        self.settle_time = 0.0
+        self.refresh_time = Histogram(buckets)
+
+
+class RequestMetrics(RequestHooks):
+    """Hooks collecting per controller and endpoint metrics."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Request metrics initializer."""
+        self._buckets = buckets
+        self._endpoints = {}
+        self._controllers = {}
+
+    def endpoint(self, controller, path):
+        """Retrieve the metrics of a controller endpoint"""
+        key = (controller._baseUrl, path)
+        metrics = self._endpoints.get(key)
+        if metrics is None:
+            metrics = self._endpoints[key] = EndpointMetrics(self._buckets)
+        return metrics
+
+    def controller(self, controller):
+        """Retrieve the refresh metrics of a controller"""
+        metrics = self._controllers.get(controller._baseUrl)
+        if metrics is None:
+            metrics = ControllerMetrics(self._buckets)
+            self._controllers[controller._baseUrl] = metrics
+        return metrics
+
+    def request_finished(self, controller, path, elapsed, size, decode_time):
+        metrics = self.endpoint(controller, path)
+        metrics.requests += 1
+        metrics.bytes += size
+        metrics.latency.observe(elapsed)
+        metrics.decode_time.observe(decode_time)
+
+    def request_failed(self, controller, path, elapsed, exc):
+        metrics = self.endpoint(controller, path)
+        metrics.requests += 1
+        metrics.errors += 1
+        # timeouts are raised as connection errors caused by the timeout
+        if isinstance(exc.__cause__, asyncio.TimeoutError):
+            metrics.timeouts += 1
+        metrics.latency.observe(elapsed)
+
+    def request_retried(self, controller, path, tries, wait, exc):
+        self.endpoint(controller, path).retries += 1
+
+    def refresh_finished(self, controller, parts, elapsed):
+        metrics = self.controller(controller)
+        metrics.refreshes += 1
+        metrics.refresh_time.observe(elapsed)
+
+    def auto_refresh_started(self, controller, parts, settle_time):
+        metrics = self.controller(controller)
+        metrics.auto_refreshes += 1
+        metrics.settle_time += settle_time
+
+    def prometheus(self):
+        """Export metrics in the Prometheus text format"""
+        lines = []
+
+        def family(name, metric_type, help_text):
+            lines.append(f"# HELP opensprinkler_{name} {help_text}")
+            lines.append(f"# TYPE opensprinkler_{name} {metric_type}")
+
+        def sample(name, labels, value):
+            label_text = ",".join(
+                f'{key}="{_escape_label(label)}"' for key, label in labels
+            )
+            lines.append(f"opensprinkler_{name}{{{label_text}}} {value}")
+
+        def histogram(name, labels, histogram):
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                sample(f"{name}_bucket", labels + [("le", bound)], count)
+            sample(f"{name}_bucket", labels + [("le", "+Inf")], histogram.count)
+            sample(f"{name}_sum", labels, histogram.sum)
+            sample(f"{name}_count", labels, histogram.count)
+
+        endpoints = sorted(self._endpoints.items())
+        counters = [
+            ("requests_total", "requests", "Requests sent, including retries"),
+            ("request_errors_total", "errors", "Failed requests"),
+            ("request_timeouts_total", "timeouts", "Timed out requests"),
+            ("request_retries_total", "retries", "Retried requests"),
+            ("response_bytes_total", "bytes", "Response payload bytes"),
+        ]
+        for name, attribute, help_text in counters:
+            family(name, "counter", help_text)
+            for (url, path), metrics in endpoints:
+                labels = [("controller", url), ("endpoint", path)]
+                sample(name, labels, getattr(metrics, attribute))
+
+        family("request_duration_seconds", "histogram", "Request latency")
+        for (url, path), metrics in endpoints:
+            labels = [("controller", url), ("endpoint", path)]
+            histogram("request_duration_seconds", labels, metrics.latency)
+
+        family("decode_duration_seconds", "histogram", "JSON decode time")
+        for (url, path), metrics in endpoints:
+            labels = [("controller", url), ("endpoint", path)]
+            histogram("decode_duration_seconds", labels, metrics.decode_time)
+
+        controllers = sorted(self._controllers.items())
+        family("refreshes_total", "counter", "State refreshes")
+        for url, metrics in controllers:
+            sample("refreshes_total", [("controller", url)], metrics.refreshes)
+
+        family("auto_refreshes_total", "counter", "Refreshes after updates")
+        for url, metrics in controllers:
+            sample(
+                "auto_refreshes_total", [("controller", url)], metrics.auto_refreshes
+            )
+
+        family("settle_seconds_total", "counter", "Time updates waited to settle")
+        for url, metrics in controllers:
+            sample("settle_seconds_total", [("controller", url)], metrics.settle_time)
+
+        family("refresh_duration_seconds", "histogram", "State refresh time")
+        for url, metrics in controllers:
+            histogram(
+                "refresh_duration_seconds", [("controller", url)], metrics.refresh_time
+            )
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
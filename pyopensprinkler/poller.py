@@ -0,0 +1,142 @@
+"""Poller module refreshing controllers at an activity adapted interval."""
+
+import asyncio
+import logging
+import time
+
+from pyopensprinkler.refresh import _retrieve_exception
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def poll_interval(controller, fast_interval, slow_interval, margin=1):
+    """
+    Seconds until the next poll of a controller
+
+    Polls every fast_interval seconds while stations run or are queued and every
+    slow_interval seconds when idle, paused or rain delayed. Polls are brought forward
+    to margin seconds after the next expected change: the next station end, the end
+    of the pause or rain delay, or the next forecast program start.
+    """
+    # device time of the last refresh, moved on by the seconds elapsed since
+    fetched = controller._state_times.get("settings")
+    now = controller.device_time
+    if fetched is not None:
+        now += max(int(time.time() - fetched), 0)
+    interval = slow_interval
+    changes = []
+
+    if controller.pause_active:
+        # remaining when refreshed
+        changes.append(controller.device_time + (controller.pause_time_remaining or 0))
+    else:
+        table = controller.stations.table()
+        active = False
+        for running, pid, end in zip(table["running"], table["pid"], table["end"]):
+            if running or pid:
+                active = True
+                changes.append(end)
+        if active:
+            interval = fast_interval
+        elif controller.rain_delay_active:
+            changes.append(controller.rain_delay_stop_time)
+        elif controller.enabled:
+            runs = controller.forecast(now, now + slow_interval)
+            changes.extend(run.start for run in runs if run.start >= now)
+
+    changes = [change for change in changes if change]
+    if changes:
+        interval = min(interval, max(min(changes) - now, 0) + margin)
+    return interval
+
+
+class Poller(object):
+    """Background refresh loop of a controller."""
+
+    def __init__(self, controller, parts=None):
+        """Poller initializer."""
+        self._controller = controller
+        self._parts = parts
+        self._task = None
+        self._poll_count = 0
+        self._last_error = None
+
+    @property
+    def running(self):
+        """Return True while the loop runs"""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def last_error(self):
+        """Error of the last poll, None if it succeeded"""
+        return self._last_error
+
+    @property
+    def poll_count(self):
+        """Number of refreshes sent by the loop"""
+        return self._poll_count
+
+    def start(self):
+        """Start the loop unless already running"""
+        if not self.running:
+            self._task = asyncio.ensure_future(self._run())
+            self._task.add_done_callback(_retrieve_exception)
+
+    async def stop(self):
+        """Stop the loop, raising the error that ended it if any"""
+        if self._task is None:
+            return
+
+        task, self._task = self._task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def _next_interval(self):
+        controller = self._controller
+        slow_interval = controller._opts["polling"]["slow_interval"]
+        if self._last_error is not None:
+            # the state is stale, its activity says nothing about the controller
+            interval = slow_interval
+        elif controller._state is None:
+            interval = 0
+        else:
+            try:
+                interval = controller.poll_interval
+            except Exception:
+                _LOGGER.exception(
+                    "Cannot compute the poll interval of %s", controller._baseUrl
+                )
+                interval = slow_interval
+
+        breaker = controller.circuit_breaker
+        if breaker is not None and breaker.retry_after > 0:
+            # no request goes out before the circuit lets a trial through
+            interval = breaker.retry_after
+        return interval
+
+    async def _run(self):
+        # avoid a circular import, the controller module imports this one
+        from pyopensprinkler import (
+            OpenSprinklerApiError,
+            OpenSprinklerAuthError,
+            OpenSprinklerConnectionError,
+        )
+
+        controller = self._controller
+        while True:
+            await asyncio.sleep(self._next_interval())
+
+            self._poll_count += 1
+            try:
+                await controller.refresh(self._parts)
+                self._last_error = None
+            except (OpenSprinklerConnectionError, asyncio.TimeoutError) as exc:
+                self._last_error = exc
+                _LOGGER.debug("Polling %s failed: %s", controller._baseUrl, exc)
+            except (OpenSprinklerApiError, OpenSprinklerAuthError) as exc:
+                # polled again at the slow interval, the error may be temporary
+                self._last_error = exc
+                _LOGGER.warning("Polling %s failed: %s", controller._baseUrl, exc)
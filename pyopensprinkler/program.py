@@ -1,5 +1,7 @@
 """Program module handling /program/ API calls."""
 
+import contextvars
+import copy
 import json
 
 from pyopensprinkler.const import (
@@ -18,17 +20,193 @@ from pyopensprinkler.const import (
     WEEKDAYS,
 )
 
+_active_edit = contextvars.ContextVar("program_edit", default=None)
+
+
+def _decode_offset_minutes(start_time, start_index, start_time_type):
+    """Extract offset minutes from encoded start time"""
+    sign = -1 if start_time & 1 << START_TIME_SIGN_BIT else 1
+
+    if start_time == -1:  # disabled
+        return 0
+    # Only start0 has offset if repeating type
+    elif start_index > 0 and start_time_type == 0:
+        return 0
+    elif start_time & (1 << START_TIME_SUNSET_BIT | 1 << START_TIME_SUNRISE_BIT):
+        return (start_time & START_TIME_MINUTES_MASK) * sign
+    else:
+        return start_time
+
+
+def _decode_offset_type(start_time, start_index, start_time_type):
+    """Get start time offset type ('disabled', 'midnight', 'sunset', or 'sunrise')"""
+    if start_time == -1:
+        return SCHEDULE_START_TIME_OFFSET_DISABLED
+    # Only start0 has offset if repeating type
+    elif start_index > 0 and start_time_type == 0:
+        return None
+    elif start_time & 1 << START_TIME_SUNSET_BIT:
+        return SCHEDULE_START_TIME_OFFSET_SUNSET
+    elif start_time & 1 << START_TIME_SUNRISE_BIT:
+        return SCHEDULE_START_TIME_OFFSET_SUNRISE
+    else:
+        return SCHEDULE_START_TIME_OFFSET_MIDNIGHT
+
+
+class ProgramSchedule(object):
+    """Schedule decoded from a program data row."""
+
+    __slots__ = (
+        "flag",
+        "enabled",
+        "use_weather_adjustments",
+        "odd_even_restriction",
+        "program_schedule_type",
+        "start_time_type",
+        "days0",
+        "days1",
+        "start_times",
+        "start_time_offsets",
+        "start_time_offset_types",
+    )
+
+    def __init__(self, data):
+        """Program schedule initializer."""
+        flag = data[0]
+        start_time_type = flag >> 6 & 1
+        start_times = tuple(data[3])
+
+        self.flag = flag
+        self.enabled = bool(flag & 1)
+        self.use_weather_adjustments = bool(flag >> 1 & 1)
+        self.odd_even_restriction = flag >> 2 & 3
+        self.program_schedule_type = flag >> 4 & 3
+        self.start_time_type = start_time_type
+        self.days0 = data[1]
+        self.days1 = data[2]
+        self.start_times = start_times
+        self.start_time_offsets = tuple(
+            _decode_offset_minutes(start_time, i, start_time_type)
+            for i, start_time in enumerate(start_times)
+        )
+        self.start_time_offset_types = tuple(
+            _decode_offset_type(start_time, i, start_time_type)
+            for i, start_time in enumerate(start_times)
+        )
+
+
+class ProgramEdit(object):
+    """Apply program updates to a working copy and send them as a single /cp request."""
+
+    def __init__(self, program):
+        """Program edit initializer."""
+        self._program = program
+        self._data = None
+        self._token = None
+
+    async def __aenter__(self):
+        if _active_edit.get() is not None:
+            raise RuntimeError("A program edit is already active")
+
+        self._data = copy.deepcopy(self._program._get_program_data())
+        self._token = _active_edit.set(self)
+        return self._program
+
+    async def __aexit__(self, exc_type, exc, tb):
+        _active_edit.reset(self._token)
+        self._token = None
+
+        if exc_type is not None:
+            self._data = None
+            return False
+
+        await self.commit()
+        return False
+
+    def _is_editing(self, program):
+        return (
+            program._controller is self._program._controller
+            and program._index == self._program._index
+        )
+
+    def update(self, params):
+        """Apply /cp parameters to the working copy"""
+        if "v" in params:
+            data = json.loads(params["v"])
+            data.insert(5, params["name"])
+            self._data = data
+
+        if "en" in params:
+            self._data[0] = self._program._bit_set(self._data[0], 0, bool(params["en"]))
+
+        if "uwt" in params:
+            self._data[0] = self._program._bit_set(
+                self._data[0], 1, bool(params["uwt"])
+            )
+
+    def validate(self):
+        """Validate the working copy, raising ValueError if invalid"""
+        flag, days0, days1, start_times, durations, name = self._data
+
+        if not 0 <= flag <= 255:
+            raise ValueError("Program flag must be 0-255")
+
+        if not isinstance(name, str):
+            raise ValueError("Program name must be a string")
+
+        if len(start_times) != 4:
+            raise ValueError("Program must have 4 start times")
+
+        station_count = len(self._program._controller._state["stations"]["snames"])
+        if len(durations) != station_count:
+            raise ValueError("Program must have a duration for every station")
+
+        if any(not 0 <= duration <= 65535 for duration in durations):
+            raise ValueError("Station durations must be 0-65535")
+
+        # interval-day schedule
+        if (flag >> 4) & 3 == 3:
+            if days1 < 1:
+                raise ValueError("Interval days must be 1 or greater")
+            if not 0 <= days0 < days1:
+                raise ValueError("Starting in days must be less than interval days")
+        elif not 0 <= days0 <= 127:
+            raise ValueError("Weekday bits must be 0-127")
+
+    async def commit(self):
+        """Validate and send the working copy"""
+        self.validate()
+        dlist = copy.deepcopy(self._data)
+        self._data = None
+        params = self._program._format_program_data(dlist)
+        params["pid"] = self._program._index
+
+        content = await self._program._controller.request("/cp", params)
+        return content["result"]
+
 
 class Program(object):
     """Program class with /program/ API calls."""
 
+    __slots__ = ("_controller", "_index")
+
     def __init__(self, controller, index):
         """Program class initializer."""
         self._controller = controller
         self._index = index
 
+    def _get_edit(self):
+        """Retrieve the active edit of this program, if any"""
+        edit = _active_edit.get()
+        if edit is not None and edit._data is not None and edit._is_editing(self):
+            return edit
+        return None
+
     def _get_program_data(self):
-        return self._controller._state["programs"]["pd"][self._index]
+        edit = self._get_edit()
+        if edit is not None:
+            return edit._data
+        return self._controller._retrieve_state()["programs"]["pd"][self._index]
 
     def _get_variable(self, variable_index):
         """Retrieve variable"""
@@ -41,9 +219,27 @@ class Program(object):
     async def _set_variables(self, params=None):
         if params is None:
             params = {}
+
+        edit = self._get_edit()
+        if edit is not None:
+            edit.update(params)
+            return None
+
         params["pid"] = self._index
 
+        programs = None
+        if "v" in params and self._controller._state is not None:
+            programs = self._controller._state["programs"]
+
         content = await self._controller.request("/cp", params)
+
+        # show the new program data until the next refresh, unless one already ran
+        state = self._controller._state
+        if programs is not None and state is not None and state["programs"] is programs:
+            data = json.loads(params["v"])
+            data.insert(5, params["name"])
+            programs["pd"][self._index] = data
+            self._controller._invalidate_derived()
         return content["result"]
 
     async def _manual_run(self, uwt=None, qo=None):
@@ -56,6 +252,18 @@ class Program(object):
         content = await self._controller.request("/mp", params)
         return content["result"]
 
+    def _get_schedule(self):
+        """Retrieve schedule, decoded once per state change"""
+        edit = self._get_edit()
+        if edit is not None:
+            return ProgramSchedule(edit._data)
+
+        index = self._index
+        return self._controller._get_derived(
+            ("program_schedule", index),
+            lambda state: ProgramSchedule(state["programs"]["pd"][index]),
+        )
+
     def _get_data_flag_bits(self):
         return list(
             reversed([int(x) for x in list("{0:08b}".format(self._get_variable(0)))])
@@ -84,24 +292,10 @@ class Program(object):
 
     def _get_offset_minutes(self, start_times, start_index):
         """Extract offset minutes from encoded start time"""
-        sign = -1 if self._is_set(start_times[start_index], START_TIME_SIGN_BIT) else 1
-        use_sunset = bool(self._is_set(start_times[start_index], START_TIME_SUNSET_BIT))
-        use_sunrise = bool(
-            self._is_set(start_times[start_index], START_TIME_SUNRISE_BIT)
+        return _decode_offset_minutes(
+            start_times[start_index], start_index, self.start_time_type
         )
 
-        if start_times[start_index] == -1:  # disabled
-            return 0
-        # Only start0 has offset if repeating type
-        elif start_index > 0 and self.start_time_type == 0:
-            return 0
-        elif use_sunset:
-            return (start_times[start_index] & START_TIME_MINUTES_MASK) * sign
-        elif use_sunrise:
-            return (start_times[start_index] & START_TIME_MINUTES_MASK) * sign
-        else:
-            return start_times[start_index]
-
     def _encode_offset_minutes(self, offset_type, start_time_offset):
         """Encode start time with offset minutes, sign bit, and sunset/sunrise bit"""
         new_sign_bit = 1 if start_time_offset < 0 else 0
@@ -125,22 +319,19 @@ class Program(object):
 
     def _get_offset_type(self, start_times, start_index):
         """Get start time offset type ('disabled', 'midnight', 'sunset', or 'sunrise')"""
-        use_sunset = bool(self._is_set(start_times[start_index], START_TIME_SUNSET_BIT))
-        use_sunrise = bool(
-            self._is_set(start_times[start_index], START_TIME_SUNRISE_BIT)
+        return _decode_offset_type(
+            start_times[start_index], start_index, self.start_time_type
         )
 
-        if start_times[start_index] == -1:
-            return SCHEDULE_START_TIME_OFFSET_DISABLED
-        # Only start0 has offset if repeating type
-        elif start_index > 0 and self.start_time_type == 0:
-            return None
-        elif use_sunset:
-            return SCHEDULE_START_TIME_OFFSET_SUNSET
-        elif use_sunrise:
-            return SCHEDULE_START_TIME_OFFSET_SUNRISE
-        else:
-            return SCHEDULE_START_TIME_OFFSET_MIDNIGHT
+    def edit(self):
+        """
+        Edit program
+
+        Setters called within the context update a working copy of the program, which
+        is validated and sent as a single /cp request on exit. Setters return None as
+        nothing is sent until then.
+        """
+        return ProgramEdit(self)
 
     async def enable(self):
         """Enable operation"""
@@ -161,7 +352,7 @@ class Program(object):
         return await self._manual_run(uwt, qo)
 
     async def set_name(self, name):
-        dlist = self._get_program_data().copy()
+        dlist = copy.deepcopy(self._get_program_data())
         dlist[5] = name
         params = self._format_program_data(dlist)
         return await self._set_variables(params)
@@ -170,7 +361,7 @@ class Program(object):
         return await self._set_variable("uwt", int(value))
 
     async def set_odd_even_restriction(self, value):
-        dlist = self._get_program_data().copy()
+        dlist = copy.deepcopy(self._get_program_data())
         bits = self._get_data_flag_bits()
 
         if value < 0 or value > 2:
@@ -196,7 +387,7 @@ class Program(object):
         return await self._set_variables(params)
 
     async def set_program_schedule_type(self, value):
-        dlist = self._get_program_data().copy()
+        dlist = copy.deepcopy(self._get_program_data())
         bits = self._get_data_flag_bits()
 
         if value != 0 and value != 3:
@@ -221,7 +412,7 @@ class Program(object):
         return await self._set_variables(params)
 
     async def set_start_time_type(self, value):
-        dlist = self._get_program_data().copy()
+        dlist = copy.deepcopy(self._get_program_data())
         bits = self._get_data_flag_bits()
 
         if value < 0 or value > 1:
@@ -248,14 +439,14 @@ class Program(object):
         """Set program start time with encoded value for start0, 1, 2, or 3"""
         if not 0 <= start_index <= 3:
             raise IndexError("start_index must be between 0 and 3")
-        dlist = self._get_program_data().copy()
+        dlist = copy.deepcopy(self._get_program_data())
         dlist[3][start_index] = start_time
         params = self._format_program_data(dlist)
         return await self._set_variables(params)
 
     async def set_program_start_times(self, start_times):
         """Set program start times with encoded list for start0-start3"""
-        dlist = self._get_program_data().copy()
+        dlist = copy.deepcopy(self._get_program_data())
         dlist[3] = start_times
         params = self._format_program_data(dlist)
         return await self._set_variables(params)
@@ -271,7 +462,7 @@ class Program(object):
                 f"Cannot update start{start_index} with minutes when start time type is 'repeating'"
             )
 
-        dlist = self._get_program_data().copy()
+        dlist = copy.deepcopy(self._get_program_data())
         current_offset_type = self._get_offset_type(dlist[3], start_index)
 
         # Assume offset of midnight if attempting to set new start time
@@ -302,7 +493,7 @@ class Program(object):
                 "start_time_offset_type must be one of {}".format(valid_options)
             )
 
-        dlist = self._get_program_data().copy()
+        dlist = copy.deepcopy(self._get_program_data())
         new_start = self._encode_offset_minutes(start_time_offset_type, 0)
         dlist[3][start_index] = new_start
         params = self._format_program_data(dlist)
@@ -315,7 +506,7 @@ class Program(object):
                 "Cannot update repeat count when start time type is 'fixed'"
             )
 
-        dlist = self._get_program_data().copy()
+        dlist = copy.deepcopy(self._get_program_data())
         dlist[3][1] = repeat_count
         params = self._format_program_data(dlist)
         return await self._set_variables(params)
@@ -327,7 +518,7 @@ class Program(object):
                 "Cannot update repeat count when start time type is 'fixed'"
             )
 
-        dlist = self._get_program_data().copy()
+        dlist = copy.deepcopy(self._get_program_data())
         dlist[3][2] = repeat_minutes
         params = self._format_program_data(dlist)
         return await self._set_variables(params)
@@ -339,33 +530,33 @@ class Program(object):
                 "Cannot update Weekly schedule when schedule type is 'Interval'"
             )
 
-        dlist = self._get_program_data().copy()
+        dlist = copy.deepcopy(self._get_program_data())
         dlist[1] = self._bit_set(dlist[1], WEEKDAYS.index(weekday), enabled)
         params = self._format_program_data(dlist)
         return await self._set_variables(params)
 
     async def set_station_duration(self, station_index, duration):
-        dlist = self._get_program_data().copy()
+        dlist = copy.deepcopy(self._get_program_data())
         dlist[4][station_index] = duration
         params = self._format_program_data(dlist)
         return await self._set_variables(params)
 
     async def set_station_durations(self, durations):
-        dlist = self._get_program_data().copy()
+        dlist = copy.deepcopy(self._get_program_data())
         dlist[4] = durations
         params = self._format_program_data(dlist)
         return await self._set_variables(params)
 
     async def set_days0(self, value):
         """Set days0 (weekday bits in Weekday mode, starting in days in Interval mode)"""
-        dlist = self._get_program_data().copy()
+        dlist = copy.deepcopy(self._get_program_data())
         dlist[1] = value
         params = self._format_program_data(dlist)
         return await self._set_variables(params)
 
     async def set_days1(self, value):
         """Set days1 (not used in Weekday mode, interval days in Interval mode)"""
-        dlist = self._get_program_data().copy()
+        dlist = copy.deepcopy(self._get_program_data())
         dlist[2] = value
         params = self._format_program_data(dlist)
         return await self._set_variables(params)
@@ -377,7 +568,7 @@ class Program(object):
                 "Cannot update Starting In Days when schedule type is 'Weekday'"
             )
 
-        dlist = self._get_program_data().copy()
+        dlist = copy.deepcopy(self._get_program_data())
         dlist[1] = value
         params = self._format_program_data(dlist)
         return await self._set_variables(params)
@@ -389,7 +580,7 @@ class Program(object):
                 "Cannot update Interval Days when schedule type is 'Weekday'"
             )
 
-        dlist = self._get_program_data().copy()
+        dlist = copy.deepcopy(self._get_program_data())
         dlist[2] = value
         params = self._format_program_data(dlist)
         return await self._set_variables(params)
@@ -407,41 +598,37 @@ class Program(object):
     @property
     def enabled(self):
         """Retrieve enabled flag"""
-        bits = self._get_data_flag_bits()
-        return bool(bits[0])
+        return self._get_schedule().enabled
+
+    def _get_station_indexes(self):
+        """Retrieve running and queued station indexes of this program"""
+        return self._controller._get_program_stations().get(self._index + 1, ([], []))
 
     @property
     def is_running(self):
-        for _, station in self._controller.stations.items():
-            if (
-                station.is_running
-                and station.running_program_id > 0
-                and station.running_program_id == self.index + 1
-            ):
-                return True
+        return bool(self._get_station_indexes()[0])
 
-        return False
+    @property
+    def running_stations(self):
+        """Retrieve stations running for this program"""
+        stations = self._controller.stations
+        return [stations[i] for i in self._get_station_indexes()[0]]
+
+    @property
+    def queued_stations(self):
+        """Retrieve stations waiting to run for this program"""
+        stations = self._controller.stations
+        return [stations[i] for i in self._get_station_indexes()[1]]
 
     @property
     def use_weather_adjustments(self):
         """Retrieve use weather adjustment flag"""
-        bits = self._get_data_flag_bits()
-        return bool(bits[1])
+        return self._get_schedule().use_weather_adjustments
 
     @property
     def odd_even_restriction(self):
         """Retrieve odd/even restriction state"""
-        bit2 = bool(self._get_data_flag_bits()[2])
-        bit3 = bool(self._get_data_flag_bits()[3])
-
-        value = 0
-        if bit2:
-            value += 1
-
-        if bit3:
-            value += 2
-
-        return value
+        return self._get_schedule().odd_even_restriction
 
     @property
     def odd_even_restriction_name(self):
@@ -459,17 +646,7 @@ class Program(object):
     @property
     def program_schedule_type(self):
         """Retrieve program schedule type state"""
-        bit4 = bool(self._get_data_flag_bits()[4])
-        bit5 = bool(self._get_data_flag_bits()[5])
-
-        value = 0
-        if bit4:
-            value += 1
-
-        if bit5:
-            value += 2
-
-        return value
+        return self._get_schedule().program_schedule_type
 
     @property
     def program_schedule_type_name(self):
@@ -485,7 +662,7 @@ class Program(object):
 
     @property
     def start_time_type(self):
-        return self._get_data_flag_bits()[6]
+        return self._get_schedule().start_time_type
 
     @property
     def start_time_type_name(self):
@@ -511,36 +688,24 @@ class Program(object):
         if not 0 <= start_index <= 3:
             raise IndexError("start_index must be between 0 and 3")
 
-        start_times = self._get_variable(3)
-        return self._get_offset_minutes(start_times, start_index)
+        return self._get_schedule().start_time_offsets[start_index]
 
     @property
     def program_start_time_offsets(self):
         """Retrieve program start time offsets in minutes"""
-        return [
-            self.get_program_start_time_offset(0),
-            self.get_program_start_time_offset(1),
-            self.get_program_start_time_offset(2),
-            self.get_program_start_time_offset(3),
-        ]
+        return list(self._get_schedule().start_time_offsets)
 
     def get_program_start_time_offset_type(self, start_index):
         """Retrieve program start time offset type ('midnight', 'sunset', or 'sunrise')"""
         if not 0 <= start_index <= 3:
             raise IndexError("start_index must be between 0 and 3")
 
-        start_times = self._get_variable(3)
-        return self._get_offset_type(start_times, start_index)
+        return self._get_schedule().start_time_offset_types[start_index]
 
     @property
     def program_start_time_offset_types(self):
         """Retrieve list of program start time offset types ('midnight', 'sunset', or 'sunrise')"""
-        return [
-            self.get_program_start_time_offset_type(0),
-            self.get_program_start_time_offset_type(1),
-            self.get_program_start_time_offset_type(2),
-            self.get_program_start_time_offset_type(3),
-        ]
+        return list(self._get_schedule().start_time_offset_types)
 
     @property
     def program_start_repeat_count(self):
@@ -0,0 +1,96 @@
+"""Projection module estimating runtime and water use of forecast runs."""
+
+import datetime
+
+from pyopensprinkler.forecast import SECONDS_PER_DAY, _to_timestamp
+
+EPOCH = datetime.date(1970, 1, 1)
+
+
+class Projection(object):
+    """Runtime (seconds) and water volume totals per station, program and day."""
+
+    def __init__(self):
+        """Projection initializer."""
+        self.station_runtime = {}
+        self.station_volume = {}
+        self.program_runtime = {}
+        self.program_volume = {}
+        self.day_runtime = {}
+        self.day_volume = {}
+        self.total_runtime = 0
+        self.total_volume = 0.0
+        self.unknown_flow_stations = set()
+
+    def _add(self, station_index, program_index, day, seconds, volume):
+        self.station_runtime[station_index] = (
+            self.station_runtime.get(station_index, 0) + seconds
+        )
+        if program_index is None:
+            # master stations open with their stations, their water is counted there
+            return
+
+        self.station_volume[station_index] = (
+            self.station_volume.get(station_index, 0.0) + volume
+        )
+        self.program_runtime[program_index] = (
+            self.program_runtime.get(program_index, 0) + seconds
+        )
+        self.program_volume[program_index] = (
+            self.program_volume.get(program_index, 0.0) + volume
+        )
+        self.day_runtime[day] = self.day_runtime.get(day, 0) + seconds
+        self.day_volume[day] = self.day_volume.get(day, 0.0) + volume
+        self.total_runtime += seconds
+        self.total_volume += volume
+
+
+def project_runs(
+    runs, flow_rates=None, default_flow_rate=None, start=None, end=None, utc_offset=0
+):
+    """
+    Aggregate runs into runtime and water volume totals
+
+    flow_rates maps station index to volume per minute, default_flow_rate is used for
+    other stations. Stations without a rate or with a zero rate are listed in
+    unknown_flow_stations and add no volume. Runs are
+    clipped to start and end when given and split at device local midnights, days are
+    dates in device local time (UTC plus utc_offset seconds).
+    """
+    if flow_rates is None:
+        flow_rates = {}
+    if start is not None:
+        start = _to_timestamp(start)
+    if end is not None:
+        end = _to_timestamp(end)
+
+    projection = Projection()
+    for run in runs:
+        run_start = run.start if start is None else max(run.start, start)
+        run_end = run.end if end is None else min(run.end, end)
+        if run_end <= run_start:
+            continue
+
+        sid = run.station_index
+        flow_rate = flow_rates.get(sid, default_flow_rate)
+        if not flow_rate:
+            flow_rate = 0.0
+            if run.program_index is not None:
+                projection.unknown_flow_stations.add(sid)
+
+        local_start = run_start + utc_offset
+        local_end = run_end + utc_offset
+        while local_start < local_end:
+            day = local_start // SECONDS_PER_DAY
+            day_end = min((day + 1) * SECONDS_PER_DAY, local_end)
+            seconds = day_end - local_start
+            projection._add(
+                sid,
+                run.program_index,
+                EPOCH + datetime.timedelta(days=day),
+                seconds,
+                flow_rate * seconds / 60,
+            )
+            local_start = day_end
+
+    return projection
@@ -0,0 +1,127 @@
+"""Refresh module coalescing state refreshes after updates."""
+
+import asyncio
+
+
+def _retrieve_exception(future):
+    """Mark a future exception as retrieved when nobody awaits the refresh"""
+    if not future.cancelled():
+        future.exception()
+
+
+class RefreshCoalescer(object):
+    """Debounce refresh requests into one trailing refresh per burst of updates."""
+
+    def __init__(self, refresh, settle_time):
+        """Refresh coalescer initializer."""
+        self._refresh = refresh
+        self._settle_time = settle_time
+        self._pending = None
+        self._parts = set()
+        self._timer = None
+        self._running = None
+        self._refresh_count = 0
+        self._update_count = 0
+        self._dirty_since = None
+        self._last_settle_time = None
+
+    def mark_dirty(self, parts=None):
+        """
+        Mark state parts as dirty and (re)start the settle timer
+
+        Returns a future resolved with the result of the trailing refresh, shared
+        by every update of the same burst. parts of None marks the whole state.
+        """
+        loop = asyncio.get_running_loop()
+        self._update_count += 1
+
+        if parts is None:
+            self._parts = None
+        elif self._parts is not None:
+            self._parts.update(parts)
+
+        if self._pending is None:
+            self._pending = loop.create_future()
+            self._pending.add_done_callback(_retrieve_exception)
+            self._dirty_since = loop.time()
+
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_later(float(self._settle_time), self._fire)
+
+        return self._pending
+
+    async def wait(self):
+        """Wait for the pending or running refresh, if any"""
+        if self._pending is None:
+            if self._running is not None:
+                await asyncio.shield(self._running)
+            return None
+        # a cancelled waiter leaves the refresh to the other updates of the burst
+        return await asyncio.shield(self._pending)
+
+    def cancel(self):
+        """Cancel the pending refresh"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        self._parts = set()
+
+    def _fire(self):
+        self._timer = None
+
+        # updates made during a running refresh get their own refresh afterwards
+        if self._running is not None or self._pending is None:
+            return
+
+        future = self._pending
+        parts = None if self._parts is None else sorted(self._parts)
+        self._pending = None
+        self._parts = set()
+        self._running = asyncio.ensure_future(
+            self._run(future, parts, self._dirty_since)
+        )
+
+    async def _run(self, future, parts, dirty_since):
+        try:
+            self._refresh_count += 1
+            self._last_settle_time = asyncio.get_running_loop().time() - dirty_since
+            result = await self._refresh(parts)
+            if not future.done():
+                future.set_result(result)
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+        finally:
+            self._running = None
+            if self._pending is not None and self._timer is None:
+                self._fire()
+
+    @property
+    def dirty(self):
+        """Return True if a refresh is pending"""
+        return self._pending is not None
+
+    @property
+    def pending_parts(self):
+        """State parts of the pending refresh, None for the whole state"""
+        return None if self._parts is None else set(self._parts)
+
+    @property
+    def refresh_count(self):
+        """Number of refreshes run"""
+        return self._refresh_count
+
+    @property
+    def last_settle_time(self):
+        """Seconds between the first update of the last burst and its refresh"""
+        return self._last_settle_time
+
+    @property
+    def update_count(self):
+        """Number of updates that requested a refresh"""
+        return self._update_count
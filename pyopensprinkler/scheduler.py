@@ -0,0 +1,106 @@
+"""Scheduler module serializing HTTP requests to a controller."""
+
+import asyncio
+import collections
+import time
+
+
+class RequestScheduler(object):
+    """FIFO asyncio scheduler limiting concurrent requests to one controller."""
+
+    def __init__(self, concurrency=1):
+        """Request scheduler initializer."""
+        if concurrency < 1:
+            raise ValueError("concurrency must be 1 or greater")
+
+        self._concurrency = concurrency
+        self._in_flight = 0
+        self._waiters = collections.deque()
+        self._total_requests = 0
+        self._max_queue_depth = 0
+        self._total_wait_time = 0.0
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+    async def acquire(self):
+        """Wait for a free request slot, in arrival order"""
+        self._total_requests += 1
+
+        if self._in_flight < self._concurrency and not self._waiters:
+            self._in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._max_queue_depth = max(self._max_queue_depth, len(self._waiters))
+        queued_at = time.monotonic()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # slot was handed over just before the cancellation, pass it on
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        finally:
+            self._total_wait_time += time.monotonic() - queued_at
+
+    def release(self):
+        """Release a request slot, handing it to the oldest waiter"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # slot is transferred, in-flight count is unchanged
+                waiter.set_result(None)
+                return
+
+        self._in_flight -= 1
+
+    @property
+    def concurrency(self):
+        """Maximum number of concurrent requests"""
+        return self._concurrency
+
+    @property
+    def in_flight(self):
+        """Number of requests currently being sent"""
+        return self._in_flight
+
+    @property
+    def queue_depth(self):
+        """Number of requests waiting for a slot"""
+        return len(self._waiters)
+
+    @property
+    def max_queue_depth(self):
+        """Highest number of requests seen waiting for a slot"""
+        return self._max_queue_depth
+
+    @property
+    def total_requests(self):
+        """Number of requests scheduled"""
+        return self._total_requests
+
+    @property
+    def total_wait_time(self):
+        """Total time in seconds requests spent waiting for a slot"""
+        return self._total_wait_time
+
+    @property
+    def metrics(self):
+        """Return scheduler metrics"""
+        return {
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "total_requests": self.total_requests,
+            "total_wait_time": self.total_wait_time,
+        }
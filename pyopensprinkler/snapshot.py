@@ -0,0 +1,102 @@
+"""Snapshot module storing controller state on disk."""
+
+import json
+import os
+import struct
+import time
+
+from pyopensprinkler.const import STATE_ENDPOINTS
+
+SNAPSHOT_MAGIC = b"OSSNAP"
+SNAPSHOT_VERSION = 1
+
+# magic, version, save time, url length and payload length, followed by the url
+# and the JSON payload with the state and the refresh time of each state part
+_HEADER = struct.Struct("<6sBdHI")
+
+
+class Snapshot(object):
+    """Controller state loaded from a snapshot."""
+
+    __slots__ = ("url", "state", "state_times", "saved")
+
+    def __init__(self, url, state, state_times, saved):
+        """Snapshot initializer."""
+        self.url = url
+        self.state = state
+        self.state_times = state_times
+        self.saved = saved
+
+
+def dump_snapshot(path, url, state, state_times):
+    """Write a snapshot, replacing the file at once"""
+    url = url.encode("utf-8")
+    payload = json.dumps(
+        {"state": state, "state_times": state_times}, separators=(",", ":")
+    ).encode("utf-8")
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, time.time(), len(url), len(payload)
+    )
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(header)
+        file.write(url)
+        file.write(payload)
+    os.replace(temporary, path)
+
+
+def load_snapshot(path, loads=json.loads):
+    """
+    Read a snapshot, or a /ja JSON document captured from a controller
+
+    A /ja document gets the file modification time as refresh time and no url.
+    Raises ValueError for empty, truncated or otherwise invalid files.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+        modified = os.fstat(file.fileno()).st_mtime
+
+    if not data.startswith(SNAPSHOT_MAGIC):
+        state = _loads(loads, data, path)
+        _check_state(state, path)
+        state_times = {part: modified for part in STATE_ENDPOINTS}
+        return Snapshot(None, state, state_times, modified)
+
+    if len(data) < _HEADER.size:
+        raise ValueError(f"Truncated snapshot file: {path}")
+
+    _, version, saved, url_length, payload_length = _HEADER.unpack_from(data)
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {version}")
+
+    start = _HEADER.size
+    if len(data) != start + url_length + payload_length:
+        raise ValueError(f"Truncated snapshot file: {path}")
+
+    try:
+        url = data[start : start + url_length].decode("utf-8")
+    except UnicodeDecodeError as exc:
+        raise ValueError(f"Invalid snapshot file: {path}") from exc
+
+    payload = _loads(loads, data[start + url_length :], path)
+    if not isinstance(payload, dict) or "state_times" not in payload:
+        raise ValueError(f"Invalid snapshot file: {path}")
+    _check_state(payload.get("state"), path)
+    return Snapshot(url, payload["state"], payload["state_times"], saved)
+
+
+def _check_state(state, path):
+    """Raise ValueError unless state has every state part"""
+    if not isinstance(state, dict) or not all(
+        part in state for part in STATE_ENDPOINTS
+    ):
+        raise ValueError(f"Invalid snapshot file, state parts missing: {path}")
+
+
+def _loads(loads, data, path):
+    try:
+        return loads(data)
+    except ValueError as exc:
+        # decoders raise ValueError subclasses for invalid JSON
+        raise ValueError(f"Invalid snapshot file: {path}") from exc
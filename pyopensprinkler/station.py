@@ -1,8 +1,12 @@
 """Station module handling /station/ API calls."""
 
-import math
+import contextvars
+import urllib
+from array import array
 
 from pyopensprinkler.const import (
+    MAX_QUERY_LENGTH,
+    STATION_BIT_PROPERTIES,
     STATION_STATUS_IDLE,
     STATION_STATUS_MANUAL,
     STATION_STATUS_MASTER_ENGAGED,
@@ -12,10 +16,242 @@ from pyopensprinkler.const import (
     STATION_TYPE_STANDARD,
 )
 
+_active_batch = contextvars.ContextVar("station_batch", default=None)
+
+
+def _decode_station_bits(state):
+    """Decode every per bank station bit array of state, bit n is station n"""
+    stations = state["stations"]
+    return {
+        key: int.from_bytes(bytes(stations[key]), "little")
+        for key in STATION_BIT_PROPERTIES
+        if key in stations
+    }
+
+
+def _station_status(is_running, pid, is_master):
+    """Retrieve status from running flag, program id and master flag"""
+    if is_running:
+        if pid == 99:
+            state = STATION_STATUS_MANUAL
+        elif pid == 254:
+            state = STATION_STATUS_ONCE_PROGRAM
+        elif pid == 0:
+            if is_master:
+                state = STATION_STATUS_MASTER_ENGAGED
+            else:
+                state = STATION_STATUS_IDLE
+        else:
+            state = STATION_STATUS_PROGRAM
+    else:
+        if pid > 0:
+            state = STATION_STATUS_WAITING
+        else:
+            state = STATION_STATUS_IDLE
+
+    return state
+
+
+class StationBatch(object):
+    """Collect station attribute updates and send them as merged /cs requests."""
+
+    def __init__(self, controller, max_query_length=None):
+        """Station batch initializer."""
+        if max_query_length is None:
+            max_query_length = MAX_QUERY_LENGTH
+
+        self._controller = controller
+        self._max_query_length = max_query_length
+        self._params = {}
+        self._saved_bits = None
+        self._token = None
+
+    async def __aenter__(self):
+        if _active_batch.get() is not None:
+            raise RuntimeError("A station batch is already active")
+
+        # bit updates are applied to local state immediately, keep a copy to undo them
+        self._saved_bits = {}
+        if self._controller._state is not None:
+            for key, value in self._controller._state["stations"].items():
+                if isinstance(value, list):
+                    self._saved_bits[key] = list(value)
+
+        self._token = _active_batch.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        _active_batch.reset(self._token)
+        self._token = None
+
+        if exc_type is not None:
+            self.discard()
+            return False
+
+        await self.commit()
+        return False
+
+    def update(self, params):
+        """Add station attribute parameters to the batch"""
+        self._params.update(params)
+
+    def discard(self):
+        """Drop collected updates and undo local bit changes"""
+        self._params = {}
+        if self._controller._state is not None:
+            self._controller._state["stations"].update(self._saved_bits)
+            self._controller._invalidate_derived()
+
+    def _chunk_params(self):
+        """Split parameters into groups fitting in the query length limit"""
+        # room for the password parameter added to every request
+        limit = self._max_query_length - len("&pw=") - 32
+        chunks = []
+        chunk = {}
+        length = 0
+        for key, value in self._params.items():
+            size = len(urllib.parse.urlencode({key: value})) + 1
+            if chunk and length + size > limit:
+                chunks.append(chunk)
+                chunk = {}
+                length = 0
+            chunk[key] = value
+            length += size
+
+        if chunk:
+            chunks.append(chunk)
+
+        return chunks
+
+    async def commit(self):
+        """
+        Send collected updates, refreshing once after the last request
+
+        When a request fails local changes are undone and stations are refreshed if
+        earlier requests were applied, before the error is raised.
+        """
+        chunks = self._chunk_params()
+        self._params = {}
+
+        results = []
+        try:
+            for i, chunk in enumerate(chunks):
+                refresh_on_update = None if i == len(chunks) - 1 else False
+                content = await self._controller.request(
+                    "/cs", chunk, refresh_on_update=refresh_on_update
+                )
+                results.append(content["result"])
+        except Exception:
+            # undo the local bit changes, then fetch what the sent chunks applied
+            self.discard()
+            if results:
+                try:
+                    await self._controller.refresh(["stations"])
+                except Exception:
+                    pass
+            raise
+
+        return results
+
+    @property
+    def pending(self):
+        """Collected parameters not sent yet"""
+        return dict(self._params)
+
+
+class Stations(dict):
+    """Stations of a controller indexed by station index."""
+
+    def __init__(self, controller):
+        """Stations initializer."""
+        super().__init__()
+        self._controller = controller
+
+    def batch(self, max_query_length=None):
+        """
+        Batch station attribute updates
+
+        Station setters called within the context are collected and sent as the fewest
+        /cs requests on exit. Setters return None as nothing is sent until then.
+        """
+        return StationBatch(self._controller, max_query_length)
+
+    def table(self, as_numpy=False):
+        """
+        Retrieve a columnar snapshot of all stations
+
+        Returns a dict of columns (index, name, running, pid, remaining, start, end,
+        status and one column per station bit array) built in one pass over the state,
+        or a NumPy structured array with as_numpy, which requires NumPy.
+        """
+        controller = self._controller
+        state = controller._retrieve_state()
+        bits = controller._get_station_bits()
+        offset = controller._utc_offset()
+        device_time = controller.device_time
+        masters = (controller.master_station_1, controller.master_station_2)
+
+        columns = {
+            "index": array("l"),
+            "name": [],
+            "running": array("b"),
+            "pid": array("l"),
+            "remaining": array("q"),
+            "start": array("q"),
+            "end": array("q"),
+            "status": [],
+        }
+        flags = {key: array("b") for key in bits}
+
+        names = state["stations"]["snames"]
+        for index, (name, running, status) in enumerate(
+            zip(names, state["status"]["sn"], state["settings"]["ps"])
+        ):
+            pid, remaining, start = status[0], status[1], status[2]
+            if start != 0:
+                start -= offset
+            end = 0 if start == 0 else max(start, device_time) + remaining
+
+            columns["index"].append(index)
+            columns["name"].append(name)
+            columns["running"].append(running)
+            columns["pid"].append(pid)
+            columns["remaining"].append(remaining)
+            columns["start"].append(start)
+            columns["end"].append(end)
+            columns["status"].append(
+                _station_status(running, pid, index + 1 in masters)
+            )
+            for key, value in bits.items():
+                flags[key].append(value >> index & 1)
+
+        columns.update(flags)
+        if not as_numpy:
+            return columns
+
+        import numpy
+
+        dtype = [
+            ("index", "i4"),
+            ("name", "U32"),
+            ("running", "?"),
+            ("pid", "i4"),
+            ("remaining", "i8"),
+            ("start", "i8"),
+            ("end", "i8"),
+            ("status", "U16"),
+        ] + [(key, "?") for key in flags]
+        table = numpy.zeros(len(columns["index"]), dtype=dtype)
+        for key, column in columns.items():
+            table[key] = column
+        return table
+
 
 class Station(object):
     """Station class with /station/ API calls."""
 
+    __slots__ = ("_controller", "_index")
+
     def __init__(self, controller, index):
         """Station class initializer."""
         self._controller = controller
@@ -30,7 +266,9 @@ class Station(object):
         If a station is not running (sbit is 0) but has a non-zero pid, that means the station is in the queue
         waiting to run.
         """
-        return self._controller._state["settings"]["ps"][self._index][statusIndex]
+        return self._controller._retrieve_state()["settings"]["ps"][self._index][
+            statusIndex
+        ]
 
     async def _manual_run(self, params=None):
         """Manual station run"""
@@ -47,32 +285,31 @@ class Station(object):
         if params is None:
             params = {}
 
+        batch = _active_batch.get()
+        if batch is not None and batch._controller is self._controller:
+            batch.update(params)
+            return None
+
         content = await self._controller.request("/cs", params)
         return content["result"]
 
     def _bit_check(self, bit_property):
         # [254, 255, 255]
         # 254 = all but first station in the first block of 8 have master1 enabled
-        # each entry is for next block of 8 stations
-        bits = self._controller._state["stations"][bit_property]
-        bank = math.floor(self._index / 8)
-        bits = list(reversed([int(x) for x in list("{0:08b}".format(bits[bank]))]))
-        position = self._index % 8
-
-        return bool(bits[position])
+        # each entry is for next block of 8 stations, decoded into one integer per refresh
+        bits = self._controller._get_station_bits()[bit_property]
+        return bool(bits >> self._index & 1)
 
     async def _bit_set(self, bit_property, bit_update_name, value):
-        bit_list = self._controller._state["stations"][bit_property]
-        bank = math.floor(self._index / 8)
-        bits = list(reversed([int(x) for x in list("{0:08b}".format(bit_list[bank]))]))
-        position = self._index % 8
-        value = int(value)
-        bits[position] = value
-        bits = list(reversed(bits))
-        bits = "".join(map(str, bits))
-        bits = int(bits, 2)
+        bit_list = self._controller._retrieve_state()["stations"][bit_property]
+        bank = self._index // 8
+        mask = 1 << self._index % 8
+        if int(value):
+            bits = bit_list[bank] | mask
+        else:
+            bits = bit_list[bank] & ~mask
         bit_list[bank] = bits
-        self._controller._state["stations"][bit_property] = bit_list
+        self._controller._invalidate_derived()
         return await self._set_attribute(bit_update_name + str(bank), bits)
 
     async def run(self, seconds=None, qo=None):
@@ -166,7 +403,7 @@ class Station(object):
     @property
     def name(self):
         """Station name"""
-        return self._controller._state["stations"]["snames"][self._index]
+        return self._controller._retrieve_state()["stations"]["snames"][self._index]
 
     @property
     def index(self):
@@ -176,7 +413,7 @@ class Station(object):
     @property
     def is_running(self):
         """Retrieve is running flag"""
-        return bool(self._controller._state["status"]["sn"][self._index])
+        return bool(self._controller._retrieve_state()["status"]["sn"][self._index])
 
     @property
     def is_master(self):
@@ -217,7 +454,7 @@ class Station(object):
 
     @property
     def max_name_length(self):
-        return self._controller._state["stations"]["maxlen"]
+        return self._controller._retrieve_state()["stations"]["maxlen"]
 
     @property
     def master_1_operation_enabled(self):
@@ -263,25 +500,4 @@ class Station(object):
     @property
     def status(self):
         """Retrieve status"""
-        is_running = self.is_running
-        pid = self.running_program_id
-
-        if is_running:
-            if pid == 99:
-                state = STATION_STATUS_MANUAL
-            elif pid == 254:
-                state = STATION_STATUS_ONCE_PROGRAM
-            elif pid == 0:
-                if self.is_master:
-                    state = STATION_STATUS_MASTER_ENGAGED
-                else:
-                    state = STATION_STATUS_IDLE
-            else:
-                state = STATION_STATUS_PROGRAM
-        else:
-            if pid > 0:
-                state = STATION_STATUS_WAITING
-            else:
-                state = STATION_STATUS_IDLE
-
-        return state
+        return _station_status(self.is_running, self.running_program_id, self.is_master)
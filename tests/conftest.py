@@ -1,10 +1,45 @@
 import pytest
-from const import PASSWORD, URL
+from const import FIRMWARE_VERSION, PASSWORD, URL
 from pyopensprinkler import Controller as OpenSprinkler
+from pyopensprinkler.emulator import OpenSprinklerEmulator
 
 
 @pytest.fixture
-async def controller():
-    controller = OpenSprinkler(URL, PASSWORD)
+async def start_emulator():
+    """Start emulators with the given options, stopped on teardown"""
+    started = []
+
+    async def start(opts=None):
+        emulator = OpenSprinklerEmulator(PASSWORD, opts)
+        await emulator.start()
+        started.append(emulator)
+        return emulator
+
+    yield start
+
+    for emulator in started:
+        await emulator.stop()
+
+
+@pytest.fixture
+async def controller_url(start_emulator):
+    if URL is not None:
+        return URL
+
+    firmware_version, firmware_minor = divmod(round(FIRMWARE_VERSION * 10), 10)
+    emulator = await start_emulator(
+        {"firmware_version": firmware_version, "firmware_minor": firmware_minor}
+    )
+    return emulator.url
+
+
+@pytest.fixture
+async def controller(controller_url):
+    opts = {}
+    if URL is None:
+        # the emulator applies updates at once
+        opts["auto_refresh_on_update"] = {"settle_time": 0.05}
+
+    controller = OpenSprinkler(controller_url, PASSWORD, opts)
     yield controller
     await controller.session_close()
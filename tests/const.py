@@ -1,5 +1,18 @@
 import os
 
-URL = os.environ.get("CONTROLLER_URL") or "http://localhost:8080"
+# tests run against the bundled emulator unless a controller url is given
+URL = os.environ.get("CONTROLLER_URL")
 PASSWORD = os.environ.get("CONTROLLER_PASSWORD") or "opendoor"
 FIRMWARE_VERSION = float(os.environ.get("CONTROLLER_FIRMWARE") or "219")
+
+MONDAY = 1609718400  # 2021-01-04 00:00 UTC
+
+
+class Clock(object):
+    """Emulator clock set by tests"""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
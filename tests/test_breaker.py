@@ -0,0 +1,111 @@
+import aiohttp
+import pytest
+from const import PASSWORD, Clock
+from pyopensprinkler import (
+    Controller,
+    OpenSprinklerCircuitOpenError,
+    OpenSprinklerConnectionError,
+)
+from pyopensprinkler.breaker import CircuitBreaker
+from pyopensprinkler.const import CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN
+from pyopensprinkler.fleet import ControllerFleet
+from pyopensprinkler.metrics import RequestMetrics
+
+
+@pytest.fixture
+async def emulator(start_emulator):
+    return await start_emulator()
+
+
+class TestCircuitBreaker:
+    def test_states(self):
+        clock = Clock(0)
+        breaker = CircuitBreaker(2, 30, clock)
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CIRCUIT_CLOSED
+        breaker.record_failure()
+        assert breaker.state == CIRCUIT_OPEN
+        assert not breaker.allow()
+        assert breaker.retry_after == 30
+
+        clock.now = 30
+        assert breaker.state == CIRCUIT_HALF_OPEN
+        assert breaker.allow()
+        # a single trial request at a time
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CIRCUIT_OPEN
+
+        clock.now = 60
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CIRCUIT_CLOSED
+        assert breaker.failures == 0
+
+    @pytest.mark.asyncio
+    async def test_controller(self, emulator):
+        controller = Controller(
+            emulator.url, PASSWORD, {"circuit_breaker": {"failure_threshold": 4}}
+        )
+        await controller.refresh()
+
+        emulator.opts["failure_rate"] = 1
+        # commands are sent once
+        start = emulator.request_count
+        with pytest.raises(OpenSprinklerConnectionError):
+            await controller.stations[0].run()
+        assert emulator.request_count - start == 1
+
+        # reads are retried, the last failure opens the circuit
+        start = emulator.request_count
+        with pytest.raises(OpenSprinklerConnectionError):
+            await controller.refresh()
+        assert emulator.request_count - start == 3
+        assert controller.circuit_breaker.state == CIRCUIT_OPEN
+
+        with pytest.raises(OpenSprinklerCircuitOpenError):
+            await controller.refresh()
+        assert emulator.request_count - start == 3
+
+        emulator.opts["failure_rate"] = 0
+        controller.circuit_breaker.reset()
+        await controller.refresh()
+        await controller.session_close()
+
+    @pytest.mark.asyncio
+    async def test_timeouts(self, emulator):
+        metrics = RequestMetrics()
+        controller = Controller(
+            emulator.url,
+            PASSWORD,
+            {"hooks": [metrics], "circuit_breaker": {"failure_threshold": 3}},
+        )
+        controller._request_kwargs["timeout"] = aiohttp.ClientTimeout(total=0.05)
+        emulator.opts["latency"] = 0.2
+
+        # timed out reads are retried as connection errors
+        with pytest.raises(OpenSprinklerConnectionError):
+            await controller.refresh()
+        assert emulator.request_count == 3
+        assert controller.circuit_breaker.state == CIRCUIT_OPEN
+        assert metrics.endpoint(controller, "/ja").timeouts == 3
+
+        with pytest.raises(OpenSprinklerCircuitOpenError):
+            await controller.refresh()
+        assert emulator.request_count == 3
+        await controller.session_close()
+
+    @pytest.mark.asyncio
+    async def test_fleet_skips_open_circuits(self, emulator):
+        fleet = ControllerFleet()
+        fleet.add(emulator.url, PASSWORD, key="up")
+        down = fleet.add(emulator.url, PASSWORD, key="down")
+        for _ in range(5):
+            down.circuit_breaker.record_failure()
+
+        result = await fleet.refresh()
+        assert list(result.results) == ["up"]
+        assert result.skipped == ["down"]
+        assert isinstance(result.errors["down"], OpenSprinklerCircuitOpenError)
+        await fleet.session_close()
@@ -1,7 +1,11 @@
 import asyncio
 
+import aiohttp
 import pytest
-from const import FIRMWARE_VERSION
+from const import FIRMWARE_VERSION, PASSWORD
+from pyopensprinkler import Controller, OpenSprinklerConnectionError
+from pyopensprinkler.const import EVENT_STATION_STARTED, STATE_PARTS_STATUS
+from pyopensprinkler.metrics import RequestMetrics
 
 
 class TestController:
@@ -65,6 +69,55 @@ class TestController:
         await asyncio.sleep(1)
         assert not controller.stations[0].is_running
 
+    @pytest.mark.asyncio
+    async def test_auto_refresh_coalesced(self, controller):
+        await controller.refresh()
+        refresh_count = controller._refresh_coalescer.refresh_count
+
+        await asyncio.gather(
+            *[controller.stations[i].set_name(f"S{i + 1:02}") for i in range(4)]
+        )
+        assert controller._refresh_coalescer.refresh_count == refresh_count + 1
+        assert controller.stations[3].name == "S04"
+
+    @pytest.mark.asyncio
+    async def test_auto_refresh_sequential(self, start_emulator):
+        emulator = await start_emulator()
+        controller = Controller(
+            emulator.url,
+            PASSWORD,
+            {"auto_refresh_on_update": {"settle_time": 0.05, "wait": False}},
+        )
+        await controller.refresh()
+        refresh_count = controller._refresh_coalescer.refresh_count
+
+        # updates return once sent and share the trailing refresh
+        for i in range(8):
+            await controller.stations[i].set_name(f"Zone {i + 1}")
+        await controller.refresh_settled()
+        assert controller._refresh_coalescer.refresh_count == refresh_count + 1
+        assert controller.stations[7].name == "Zone 8"
+
+        # the pending refresh is enough for the parts it covers
+        await controller.stations[0].set_name("Lawn")
+        requests = emulator.request_count
+        await controller.refresh(parts=["stations"])
+        assert emulator.request_count == requests + 1
+        assert controller.stations[0].name == "Lawn"
+
+        await controller.stations[0].set_name("Front lawn")
+        requests = emulator.request_count
+        await controller.refresh()
+        assert emulator.request_count == requests + 2
+        assert controller.stations[0].name == "Front lawn"
+
+        # errors of the pending refresh are raised
+        await controller.stations[0].set_name("Back lawn")
+        emulator.opts["failure_rate"] = 1
+        with pytest.raises(OpenSprinklerConnectionError):
+            await controller.refresh(parts=["stations"])
+        await controller.session_close()
+
     @pytest.mark.asyncio
     async def test_create_delete_program(self, controller):
         await controller.refresh()
@@ -76,6 +129,31 @@ class TestController:
         await controller.delete_program(0)
         assert len(controller.programs) == 0
 
+    @pytest.mark.asyncio
+    async def test_refresh_keeps_objects(self, controller):
+        await controller.refresh()
+        await controller.create_program("program 1")
+        await controller.create_program("program 2")
+        stations = dict(controller.stations)
+        program = controller.programs[0]
+
+        await controller.refresh()
+        assert controller.programs[0] is program
+        assert all(controller.stations[i] is stations[i] for i in stations)
+
+        await controller.delete_program(1)
+        assert list(controller.programs) == [0]
+        assert controller.programs[0] is program
+        await controller.delete_program(0)
+
+        state = controller._state
+        controller._set_state(
+            dict(state, stations=dict(state["stations"], snames=["S01", "S02"]))
+        )
+        await controller.refresh(["programs"])
+        assert list(controller.stations) == [0, 1]
+        assert controller.stations[0] is stations[0]
+
     @pytest.mark.asyncio
     async def test_rain_delay(self, controller):
         await controller.refresh()
@@ -197,3 +275,140 @@ class TestController:
         await controller.refresh()
         assert controller.stations[0].end_time - controller.stations[0].start_time == 5
         await controller.stop_all_stations()
+
+    @pytest.mark.asyncio
+    async def test_legacy_refresh_partial_failure(self, controller, monkeypatch):
+        controller._skip_all_endpoint = True
+        controller._state = {"programs": {"pd": []}}
+        failing = ["/jp"]
+
+        async def request(path, params=None):
+            await asyncio.sleep(0.05)
+            if path in failing:
+                raise OpenSprinklerConnectionError("Cannot connect to controller")
+            return {"snames": []} if path == "/jn" else {"path": path}
+
+        monkeypatch.setattr(controller, "request", request)
+        await controller._refresh_state()
+        assert controller._state["status"] == {"path": "/js"}
+        assert controller._state["programs"] == {"pd": []}
+        assert list(controller.last_refresh_errors) == ["programs"]
+
+        controller._state = None
+        with pytest.raises(OpenSprinklerConnectionError):
+            await controller._refresh_state()
+
+    @pytest.mark.asyncio
+    async def test_legacy_refresh_offline(self, start_emulator):
+        emulator = await start_emulator()
+        controller = Controller(emulator.url, PASSWORD, {"skip_all_endpoint": True})
+        await controller.refresh()
+        refresh_time = controller.last_refresh_time
+
+        await emulator.stop()
+        with pytest.raises(OpenSprinklerConnectionError):
+            await controller.refresh()
+        assert controller.last_refresh_time == refresh_time
+        await controller.session_close()
+
+    @pytest.mark.asyncio
+    async def test_partial_refresh(self, controller):
+        await controller.refresh()
+        programs = controller._state["programs"]
+
+        await controller.refresh(parts=STATE_PARTS_STATUS)
+        assert controller._state["programs"] is programs
+        assert controller.device_time > 0
+
+        with pytest.raises(ValueError):
+            await controller.refresh(parts=["unknown"])
+
+    @pytest.mark.asyncio
+    async def test_partial_refresh_offline(self, start_emulator):
+        emulator = await start_emulator()
+        metrics = RequestMetrics()
+        controller = Controller(emulator.url, PASSWORD, {"hooks": [metrics]})
+        await controller.refresh()
+        refresh_time = controller.last_refresh_time
+        state_times = dict(controller._state_times)
+
+        await emulator.stop()
+        with pytest.raises(OpenSprinklerConnectionError):
+            await controller.refresh(parts=STATE_PARTS_STATUS)
+        assert controller.last_refresh_time == refresh_time
+        assert controller._state_times == state_times
+        assert metrics.controller(controller).refreshes == 1
+        await controller.session_close()
+
+    @pytest.mark.asyncio
+    async def test_max_age(self, controller, monkeypatch):
+        calls = []
+
+        async def refresh(parts=None):
+            calls.append(parts)
+            await asyncio.sleep(0.01)
+            controller._set_state(controller._state, parts)
+
+        controller._opts["max_age"] = 60
+        controller._set_state({"options": {"wl": 100}, "settings": {}})
+        monkeypatch.setattr(controller, "refresh", refresh)
+
+        assert controller.water_level == 100
+        assert controller.state_age < 60
+        assert calls == []
+
+        controller._state_times["settings"] -= 120
+        assert controller.state_age > 60
+        assert controller.water_level == 100
+        assert controller.water_level == 100
+        await controller._refresh_task
+        assert calls == [["settings"]]
+
+        controller._state_times["options"] -= 120
+        await asyncio.gather(*[controller.ensure_fresh() for _ in range(5)])
+        assert calls == [["settings"], ["options"]]
+        assert controller.state_age < 60
+
+    @pytest.mark.asyncio
+    async def test_watch(self, controller):
+        await controller.refresh()
+        await controller.stations[0].stop()
+
+        watcher = controller.watch(interval=0.1)
+        event = asyncio.ensure_future(watcher.__anext__())
+        await asyncio.sleep(0)
+        await controller.stations[0].run(60)
+
+        event = await event
+        assert event.type == EVENT_STATION_STARTED
+        assert event.index == 0
+        await watcher.aclose()
+        await controller.stations[0].stop()
+
+    @pytest.mark.asyncio
+    async def test_watch_timeouts(self, start_emulator):
+        emulator = await start_emulator()
+        controller = Controller(
+            emulator.url,
+            PASSWORD,
+            {
+                "auto_refresh_on_update": {"enabled": False},
+                "circuit_breaker": {"enabled": False},
+            },
+        )
+        await controller.refresh()
+        controller._request_kwargs["timeout"] = aiohttp.ClientTimeout(total=0.05)
+        emulator.opts["latency"] = 0.2
+
+        watcher = controller.watch(interval=0.01)
+        event = asyncio.ensure_future(watcher.__anext__())
+        while emulator.request_count < 2:
+            await asyncio.sleep(0.01)
+
+        # the timed out poll is retried on the next one
+        emulator.opts["latency"] = 0
+        await controller.stations[0].run(60)
+        event = await event
+        assert event.type == EVENT_STATION_STARTED
+        await watcher.aclose()
+        await controller.session_close()
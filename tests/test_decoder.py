@@ -0,0 +1,27 @@
+import json
+
+import pytest
+from const import MONDAY, PASSWORD, Clock
+from pyopensprinkler import Controller
+from pyopensprinkler.decoder import JSON_DECODERS, get_json_loads
+
+
+class TestDecoder:
+    def test_get_json_loads(self):
+        assert get_json_loads("json") is json.loads
+        assert get_json_loads(json.loads) is json.loads
+        assert get_json_loads()(b'{"result": 1}') == {"result": 1}
+        with pytest.raises(ValueError):
+            get_json_loads("yaml")
+
+    @pytest.mark.parametrize("decoder", JSON_DECODERS)
+    @pytest.mark.asyncio
+    async def test_refresh(self, decoder, start_emulator):
+        pytest.importorskip(decoder)
+        emulator = await start_emulator({"clock": Clock(MONDAY)})
+        controller = Controller(emulator.url, PASSWORD, {"json_decoder": decoder})
+        try:
+            await controller.refresh()
+            assert controller._state == emulator.get_state()
+        finally:
+            await controller.session_close()
@@ -0,0 +1,85 @@
+import pytest
+from const import MONDAY, PASSWORD, Clock
+from pyopensprinkler import (
+    Controller,
+    OpenSprinklerApiError,
+    OpenSprinklerAuthError,
+    OpenSprinklerConnectionError,
+)
+
+
+@pytest.fixture
+async def emulator(start_emulator):
+    return await start_emulator({"clock": Clock(MONDAY + 300)})
+
+
+@pytest.fixture
+async def client(emulator):
+    controller = Controller(
+        emulator.url, PASSWORD, {"auto_refresh_on_update": {"enabled": False}}
+    )
+    yield controller
+    await controller.session_close()
+
+
+class TestEmulator:
+    @pytest.mark.asyncio
+    async def test_error_codes(self, emulator, client):
+        controller = Controller(emulator.url, "wrong")
+        with pytest.raises(OpenSprinklerAuthError):
+            await controller.refresh()
+        await controller.session_close()
+
+        emulator.opts["errors"]["/jp"] = 17
+        with pytest.raises(OpenSprinklerApiError):
+            await client.request("/jp")
+
+        emulator.opts["errors"] = {"/ja": 32}
+        await client.refresh()
+        assert client._skip_all_endpoint
+        assert client.firmware_version == 219
+
+    @pytest.mark.asyncio
+    async def test_failure_injection(self, emulator, client):
+        emulator.opts["failure_rate"] = 1
+        with pytest.raises(OpenSprinklerConnectionError):
+            await client.refresh()
+        assert emulator.request_count == 3
+
+    @pytest.mark.asyncio
+    async def test_sequential_queue(self, emulator, client):
+        emulator.opts["clock"].now = MONDAY + 300
+        await client.run_once_program([30, 20, 0, 10])
+        await client.refresh()
+        stations = client.stations
+        assert stations[0].is_running
+        assert stations[1].status == "waiting"
+        assert stations[1].start_time == MONDAY + 330
+        assert stations[3].start_time == MONDAY + 350
+
+        await stations[0].stop(ssta=True)
+        await client.refresh()
+        assert stations[1].is_running
+
+        emulator.opts["clock"].now += 60
+        await client.refresh()
+        assert not any(station.is_running for station in stations.values())
+        assert client.last_run_station == 3
+
+    @pytest.mark.asyncio
+    async def test_scheduled_program(self, emulator, client):
+        await client.request(
+            "/cp",
+            {
+                "pid": -1,
+                "name": "P1",
+                "v": "[3,127,0,[360,-1,-1,-1],[600,0,0,0,0,0,0,0]]",
+            },
+        )
+        await client.set_water_level(50)
+
+        emulator.opts["clock"].now = MONDAY + 360 * 60 + 5
+        await client.refresh()
+        assert client.stations[0].is_running
+        assert client.stations[0].running_program_id == 1
+        assert client.stations[0].end_time == MONDAY + 360 * 60 + 300
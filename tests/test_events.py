@@ -0,0 +1,59 @@
+import copy
+
+from pyopensprinkler.const import (
+    EVENT_PROGRAM_STARTED,
+    EVENT_PROGRAM_STOPPED,
+    EVENT_RAIN_DELAY_CHANGED,
+    EVENT_SENSOR_CHANGED,
+    EVENT_STATION_STARTED,
+    EVENT_STATION_STOPPED,
+    EVENT_WATER_LEVEL_CHANGED,
+)
+from pyopensprinkler.events import ControllerEvent, diff_states
+
+STATE = {
+    "settings": {"ps": [[0, 0, 0], [0, 0, 0], [0, 0, 0]], "rd": 0, "sn1": 0},
+    "status": {"sn": [0, 0, 0]},
+    "options": {"wl": 100},
+}
+
+
+class TestEvents:
+    def test_no_changes(self):
+        assert diff_states(STATE, copy.deepcopy(STATE)) == []
+
+    def test_station_and_program(self):
+        new = copy.deepcopy(STATE)
+        new["status"]["sn"][1] = 1
+        new["settings"]["ps"][1] = [2, 60, 1000]
+        new["settings"]["ps"][2] = [2, 60, 1060]
+
+        assert diff_states(STATE, new) == [
+            ControllerEvent(EVENT_STATION_STARTED, 1, 0, 2),
+            ControllerEvent(EVENT_PROGRAM_STARTED, 1),
+        ]
+        assert diff_states(new, STATE) == [
+            ControllerEvent(EVENT_STATION_STOPPED, 1, 2, 0),
+            ControllerEvent(EVENT_PROGRAM_STOPPED, 1),
+        ]
+
+    def test_manual_run_is_not_a_program(self):
+        new = copy.deepcopy(STATE)
+        new["status"]["sn"][0] = 1
+        new["settings"]["ps"][0] = [99, 60, 1000]
+
+        assert diff_states(STATE, new) == [
+            ControllerEvent(EVENT_STATION_STARTED, 0, 0, 99),
+        ]
+
+    def test_controller_changes(self):
+        new = copy.deepcopy(STATE)
+        new["settings"]["rd"] = 1
+        new["settings"]["sn1"] = 1
+        new["options"]["wl"] = 50
+
+        assert diff_states(STATE, new) == [
+            ControllerEvent(EVENT_RAIN_DELAY_CHANGED, None, False, True),
+            ControllerEvent(EVENT_SENSOR_CHANGED, 1, 0, 1),
+            ControllerEvent(EVENT_WATER_LEVEL_CHANGED, None, 100, 50),
+        ]
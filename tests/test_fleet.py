@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+from const import PASSWORD
+from pyopensprinkler import OpenSprinklerConnectionError
+from pyopensprinkler.fleet import ControllerFleet
+
+
+@pytest.fixture
+async def fleet():
+    fleet = ControllerFleet({"limit": 2})
+    yield fleet
+    await fleet.session_close()
+
+
+class TestControllerFleet:
+    @pytest.mark.asyncio
+    async def test_refresh(self, fleet, controller_url):
+        controller = fleet.add(controller_url, PASSWORD)
+        result = await fleet.refresh()
+        assert result.ok
+        assert controller.firmware_version
+
+    @pytest.mark.asyncio
+    async def test_run_results_and_errors(self, fleet):
+        active = []
+        overlaps = []
+
+        async def operation(controller):
+            active.append(1)
+            overlaps.append(len(active))
+            await asyncio.sleep(0.01)
+            active.pop()
+            if controller is fleet.controllers["bad"]:
+                raise OpenSprinklerConnectionError("Cannot connect to controller")
+            return controller._baseUrl
+
+        fleet.add("http://one", PASSWORD)
+        fleet.add("http://two", PASSWORD)
+        fleet.add("http://three", PASSWORD, key="bad")
+
+        result = await fleet.run(operation)
+        assert max(overlaps) == 2
+        assert result.results == {
+            "http://one": "http://one",
+            "http://two": "http://two",
+        }
+        assert list(result.errors) == ["bad"]
+        assert not result.ok
+
+    @pytest.mark.asyncio
+    async def test_shared_session(self, fleet):
+        first = fleet.add("http://one", PASSWORD)
+        fleet.session_start()
+        second = fleet.add("http://two", PASSWORD)
+        assert first._http_client is second._http_client
+
+        with pytest.raises(ValueError):
+            fleet.add("http://one", PASSWORD)
@@ -0,0 +1,127 @@
+import datetime
+
+from pyopensprinkler.forecast import ForecastRun, forecast_state
+
+# Monday 2024-01-01 00:00 UTC
+MONDAY = int(datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc).timestamp())
+DAY = 86400
+
+
+def make_state(programs, station_count=4, **options):
+    state = {
+        "options": {"tz": 48, "wl": 100, "sdt": 0, "mas": 0, "mas2": 0},
+        "settings": {"sunrise": 360, "sunset": 1080},
+        "stations": {
+            "snames": [f"S{i + 1:02}" for i in range(station_count)],
+            "stn_dis": [0] * ((station_count + 7) // 8),
+            "stn_seq": [255] * ((station_count + 7) // 8),
+            "masop": [0] * ((station_count + 7) // 8),
+        },
+        "programs": {"pd": programs},
+    }
+    state["options"].update(options)
+    return state
+
+
+def program(flag=1, days0=127, days1=0, starts=None, durations=None):
+    if starts is None:
+        starts = [360, 0, 0, 0]
+    if durations is None:
+        durations = [60, 0, 0, 0]
+    return [flag, days0, days1, starts, durations, "P"]
+
+
+class TestForecast:
+    def test_weekday_schedule(self):
+        # Monday and Wednesday at 06:00, repeating type without repeats
+        state = make_state([program(days0=0b101)])
+        runs = forecast_state(state, MONDAY, MONDAY + 7 * DAY)
+
+        assert runs == [
+            ForecastRun(MONDAY + 360 * 60, MONDAY + 360 * 60 + 60, 0, 0),
+            ForecastRun(
+                MONDAY + 2 * DAY + 360 * 60, MONDAY + 2 * DAY + 360 * 60 + 60, 0, 0
+            ),
+        ]
+
+    def test_disabled_program(self):
+        state = make_state([program(flag=0)])
+        assert forecast_state(state, MONDAY, MONDAY + 7 * DAY) == []
+
+    def test_sequential_queue_and_delay(self):
+        state = make_state([program(durations=[60, 120, 0, 30])], sdt=10)
+        runs = forecast_state(state, MONDAY, MONDAY + DAY)
+        start = MONDAY + 360 * 60
+
+        assert [
+            (run.start - start, run.duration, run.station_index) for run in runs
+        ] == [
+            (0, 60, 0),
+            (70, 120, 1),
+            (200, 30, 3),
+        ]
+
+    def test_parallel_stations(self):
+        state = make_state([program(durations=[60, 120, 0, 0])])
+        state["stations"]["stn_seq"] = [0]
+        runs = forecast_state(state, MONDAY, MONDAY + DAY)
+
+        assert [run.start for run in runs] == [MONDAY + 360 * 60] * 2
+
+    def test_interval_and_odd_days(self):
+        # every 2 days, odd days only (flag bits: enabled, odd, interval)
+        flag = 1 | 1 << 2 | 3 << 4
+        day = MONDAY // DAY
+        state = make_state([program(flag=flag, days0=day % 2, days1=2)])
+        runs = forecast_state(state, MONDAY, MONDAY + 10 * DAY)
+
+        days = [datetime.datetime.utcfromtimestamp(run.start).day for run in runs]
+        assert days == [1, 3, 5, 7, 9]
+
+    def test_repeating_fixed_and_sunset(self):
+        repeating = program(starts=[360, 2, 60, 0])
+        sunset = program(flag=1 | 1 << 6, starts=[30 | 1 << 12 | 1 << 13, -1, 600, -1])
+        state = make_state([repeating, sunset])
+        state["stations"]["stn_seq"] = [0]
+        runs = forecast_state(state, MONDAY, MONDAY + DAY)
+
+        minutes = [(run.start - MONDAY) // 60 for run in runs]
+        assert minutes == [360, 420, 480, 600, 1050]
+
+    def test_water_level_and_master(self):
+        state = make_state(
+            [program(flag=1 | 1 << 1, durations=[0, 100, 0, 0])],
+            wl=50,
+            mas=1,
+            mton=5,
+            mtof=-10,
+        )
+        state["stations"]["masop"] = [0b1110]
+        runs = forecast_state(state, MONDAY, MONDAY + DAY)
+        start = MONDAY + 360 * 60
+
+        assert runs == [
+            ForecastRun(start, start + 50, 1, 0),
+            ForecastRun(start + 5, start + 40, 0, None),
+        ]
+        assert runs[1].is_master
+
+    def test_time_zone(self):
+        # UTC+10, Monday 06:00 local is before the window, Tuesday 06:00 is not
+        state = make_state([program()], tz=88)
+        runs = forecast_state(state, MONDAY, MONDAY + DAY)
+
+        assert [run.start for run in runs] == [MONDAY + DAY + 360 * 60 - 10 * 3600]
+
+    def test_year_of_many_programs(self):
+        programs = [
+            program(days0=0b1010101, starts=[300 + i, 3, 120, 0], durations=[300] * 48)
+            for i in range(40)
+        ]
+        state = make_state(programs, station_count=48)
+
+        runs = forecast_state(state, MONDAY, MONDAY + 365 * DAY)
+        assert runs[0].start == MONDAY + 300 * 60
+        assert runs[-1].start < MONDAY + 365 * DAY
+        assert all(run.duration == 300 for run in runs)
+        assert all(a.start <= b.start for a, b in zip(runs, runs[1:]))
@@ -0,0 +1,91 @@
+import pytest
+from const import MONDAY, PASSWORD, Clock
+from pyopensprinkler import Controller
+from pyopensprinkler.const import (
+    LOG_TYPE_RAIN_DELAY,
+    LOG_TYPE_STATION,
+    LOG_TYPE_WATER_LEVEL,
+)
+from pyopensprinkler.log import LogRecord, parse_record
+from pyopensprinkler.snapshot import dump_snapshot
+
+DAY = 86400
+
+
+@pytest.fixture
+async def emulator(start_emulator):
+    # UTC+2
+    return await start_emulator({"clock": Clock(MONDAY), "time_zone": 56})
+
+
+class TestLog:
+    def test_parse_record(self):
+        assert parse_record([1, 2, 600, 7800], 7200) == LogRecord(
+            LOG_TYPE_STATION, 600, 600, 2, 1
+        )
+        assert parse_record([99, 0, 60, 1000, 2.5]).value == 2.5
+        assert parse_record([0, "rd", 3600, 3600]) == LogRecord(
+            LOG_TYPE_RAIN_DELAY, 3600, 3600
+        )
+        water_level = parse_record([0, "wl", 80, 100])
+        assert water_level == LogRecord(LOG_TYPE_WATER_LEVEL, 100, value=80)
+        assert water_level.start is None
+        assert parse_record([0, "xx", 1, 100]).type == "xx"
+
+    @pytest.mark.asyncio
+    async def test_logs(self, emulator, tmp_path):
+        clock = emulator.opts["clock"]
+        opts = {"auto_refresh_on_update": {"enabled": False}}
+        opts["log_cache_dir"] = str(tmp_path)
+        controller = Controller(emulator.url, PASSWORD, opts)
+
+        await controller.refresh()
+        await controller.stations[0].run(60)
+        clock.now += DAY
+        await controller.set_water_level(80)
+        await controller.stations[1].run(30)
+        clock.now += 60
+        await controller.refresh()
+
+        start = emulator.request_count
+        records = [record async for record in controller.logs(MONDAY - DAY, clock.now)]
+        assert records == [
+            LogRecord(LOG_TYPE_STATION, MONDAY + 60, 60, 0, 99),
+            LogRecord(LOG_TYPE_WATER_LEVEL, MONDAY + DAY, value=80),
+            LogRecord(LOG_TYPE_STATION, MONDAY + DAY + 30, 30, 1, 99),
+        ]
+        # one request per device day
+        assert emulator.request_count - start == 3
+
+        # completed days come from the cache
+        start = emulator.request_count
+        records = [record async for record in controller.logs(MONDAY, clock.now)]
+        assert len(records) == 3
+        assert emulator.request_count - start == 1
+        await controller.session_close()
+
+        controller = Controller(emulator.url, PASSWORD, opts)
+        await controller.refresh()
+        start = emulator.request_count
+        records = [record async for record in controller.logs(MONDAY, MONDAY + 61)]
+        assert records[0].start == MONDAY
+        assert emulator.request_count - start == 0
+        await controller.session_close()
+
+        # restored controllers use the cache of their snapshot url only
+        controller.save_snapshot(str(tmp_path / "a.snapshot"))
+        dump_snapshot(
+            str(tmp_path / "b.snapshot"), "http://b", controller._state, {"status": 0}
+        )
+        restored = Controller.from_snapshot(
+            str(tmp_path / "a.snapshot"), PASSWORD, dict(opts)
+        )
+        records = [record async for record in restored.logs(MONDAY, MONDAY + 61)]
+        assert records[0].start == MONDAY
+        assert emulator.request_count - start == 0
+        await restored.session_close()
+
+        other = Controller.from_snapshot(
+            str(tmp_path / "b.snapshot"), PASSWORD, dict(opts)
+        )
+        assert other._log_cache.get((MONDAY + 7200) // DAY) is None
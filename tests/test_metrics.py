@@ -0,0 +1,74 @@
+import pytest
+from const import PASSWORD
+from pyopensprinkler import Controller, OpenSprinklerConnectionError
+from pyopensprinkler.metrics import Histogram, RequestMetrics
+
+
+@pytest.fixture
+async def emulator(start_emulator):
+    return await start_emulator()
+
+
+@pytest.fixture
+async def metrics_controller(emulator):
+    metrics = RequestMetrics()
+    controller = Controller(
+        emulator.url,
+        PASSWORD,
+        {"hooks": [metrics], "auto_refresh_on_update": {"settle_time": 0.01}},
+    )
+    yield controller, metrics
+    await controller.session_close()
+
+
+class TestRequestMetrics:
+    def test_histogram(self):
+        histogram = Histogram([0.1, 1])
+        for value in [0.05, 0.5, 5]:
+            histogram.observe(value)
+        assert histogram.counts == [1, 2]
+        assert histogram.count == 3
+        assert histogram.sum == 5.55
+
+    @pytest.mark.asyncio
+    async def test_requests(self, metrics_controller):
+        controller, metrics = metrics_controller
+        await controller.refresh()
+        await controller.stations[0].set_name("metrics")
+
+        ja = metrics.endpoint(controller, "/ja")
+        assert ja.requests == 1
+        assert ja.errors == 0
+        assert ja.bytes > 0
+        assert ja.latency.count == 1
+        assert ja.decode_time.count == 1
+        assert metrics.endpoint(controller, "/cs").requests == 1
+        # the auto refresh only retrieves the updated stations
+        assert metrics.endpoint(controller, "/jn").requests == 1
+
+        refreshes = metrics.controller(controller)
+        assert refreshes.refreshes == 2
+        assert refreshes.auto_refreshes == 1
+        assert refreshes.settle_time >= 0.01
+
+        text = metrics.prometheus()
+        labels = f'controller="{controller._baseUrl}",endpoint="/ja"'
+        assert f"opensprinkler_requests_total{{{labels}}} 1" in text
+        assert (
+            f'opensprinkler_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1'
+            in text
+        )
+        assert "# TYPE opensprinkler_refreshes_total counter" in text
+
+    @pytest.mark.asyncio
+    async def test_retries(self, emulator, metrics_controller):
+        controller, metrics = metrics_controller
+        emulator.opts["failure_rate"] = 1
+        with pytest.raises(OpenSprinklerConnectionError):
+            await controller.refresh()
+
+        ja = metrics.endpoint(controller, "/ja")
+        assert ja.requests == 3
+        assert ja.errors == 3
+        assert ja.retries == 2
+        assert metrics.controller(controller).refreshes == 0
@@ -0,0 +1,127 @@
+import asyncio
+
+import aiohttp
+import pytest
+from const import MONDAY, PASSWORD, Clock
+from pyopensprinkler import Controller, OpenSprinklerApiError
+
+
+@pytest.fixture
+async def emulator(start_emulator):
+    return await start_emulator({"clock": Clock(MONDAY + 300), "firmware_version": 221})
+
+
+@pytest.fixture
+async def client(emulator):
+    controller = Controller(
+        emulator.url,
+        PASSWORD,
+        {
+            "auto_refresh_on_update": {"enabled": False},
+            "polling": {"fast_interval": 5, "slow_interval": 600},
+        },
+    )
+    await controller.refresh()
+    yield controller
+    await controller.session_close()
+
+
+class TestPoller:
+    @pytest.mark.asyncio
+    async def test_idle(self, client):
+        assert client.poll_interval == 600
+
+    @pytest.mark.asyncio
+    async def test_watering(self, client):
+        await client.run_once_program([3, 20])
+        await client.refresh()
+        # brought forward to the end of the last station
+        assert client.poll_interval == 4
+
+        # the device clock moved on since the refresh
+        client._state_times["settings"] -= 2
+        assert client.poll_interval == 2
+        client._state_times["settings"] += 2
+
+        client._opts["polling"]["fast_interval"] = 2
+        assert client.poll_interval == 2
+
+    @pytest.mark.asyncio
+    async def test_paused(self, client):
+        await client.run_once_program([30, 20])
+        await client.set_pause(120)
+        await client.refresh()
+        assert client.pause_active
+        assert client.poll_interval == 121
+
+    @pytest.mark.asyncio
+    async def test_rain_delay(self, client):
+        await client.set_rain_delay(1)
+        await client.refresh()
+        assert client.poll_interval == 600
+
+        client._opts["polling"]["slow_interval"] = 7200
+        assert client.poll_interval == 3601
+
+    @pytest.mark.asyncio
+    async def test_scheduled_program(self, emulator, client):
+        await client.request(
+            "/cp",
+            {
+                "pid": -1,
+                "name": "P1",
+                "v": "[3,127,0,[10,-1,-1,-1],[600,0,0,0,0,0,0,0]]",
+            },
+        )
+        await client.refresh()
+        # program starts at 00:10, 300 seconds from now
+        assert client.poll_interval == 301
+
+    @pytest.mark.asyncio
+    async def test_background_polling(self, emulator, client):
+        client._opts["polling"]["slow_interval"] = 0.01
+        client.start_polling()
+        assert client.polling
+
+        start = emulator.request_count
+        while emulator.request_count - start < 3:
+            await asyncio.sleep(0.01)
+        await client.stop_polling()
+        assert not client.polling
+
+        count = emulator.request_count
+        await asyncio.sleep(0.05)
+        assert emulator.request_count == count
+
+    @pytest.mark.asyncio
+    async def test_polling_survives_timeouts(self, emulator, client):
+        client._opts["polling"]["slow_interval"] = 0.01
+        client._request_kwargs["timeout"] = aiohttp.ClientTimeout(total=0.05)
+        emulator.opts["latency"] = 0.2
+        client.start_polling()
+
+        # the first poll timed out and the next one was sent
+        while client._poller.poll_count < 2:
+            await asyncio.sleep(0.01)
+        assert client.polling
+
+        emulator.opts["latency"] = 0
+        await client.stop_polling()
+
+    @pytest.mark.asyncio
+    async def test_polling_survives_api_errors(self, emulator, client):
+        client._opts["polling"]["slow_interval"] = 0.01
+        emulator.opts["errors"]["/ja"] = 17
+        client.start_polling()
+
+        while client._poller.poll_count < 3:
+            await asyncio.sleep(0.01)
+        assert client.polling
+        assert isinstance(client._poller.last_error, OpenSprinklerApiError)
+
+        del emulator.opts["errors"]["/ja"]
+        poll_count = client._poller.poll_count
+        while client._poller.poll_count < poll_count + 2:
+            await asyncio.sleep(0.01)
+        assert client._poller.last_error is None
+        await client.stop_polling()
@@ -2,6 +2,9 @@ import asyncio
 
 import pytest
 from const import FIRMWARE_VERSION
+from pyopensprinkler import OpenSprinklerConnectionError
+from pyopensprinkler.program import Program, ProgramSchedule
+from pyopensprinkler.station import Station
 
 
 @pytest.fixture
@@ -38,6 +41,45 @@ class TestProgram:
     @pytest.mark.skipif(
         FIRMWARE_VERSION <= 216, reason="only for version 217 and above"
     )
+    @pytest.mark.asyncio
+    async def test_failed_update(self, controller, program):
+        await controller.refresh()
+        start_times = list(program.program_start_times)
+        durations = list(program.station_durations)
+        schedule = program._get_schedule()
+
+        async def failing_request(path, params=None, **kwargs):
+            raise OpenSprinklerConnectionError("Cannot connect to controller")
+
+        request = controller.request
+        controller.request = failing_request
+        try:
+            with pytest.raises(OpenSprinklerConnectionError):
+                await program.set_program_start_time(0, 480)
+            with pytest.raises(OpenSprinklerConnectionError):
+                await program.set_station_duration(0, 25)
+        finally:
+            controller.request = request
+
+        assert program.program_start_times == start_times
+        assert program.station_durations == durations
+        assert program._get_schedule() is schedule
+
+    @pytest.mark.asyncio
+    async def test_update_without_refresh(self, controller, program):
+        await controller.refresh()
+        refresh_count = controller._refresh_coalescer.refresh_count
+        controller.refresh_on_update = False
+        try:
+            await program.set_station_duration(0, 30)
+        finally:
+            controller.refresh_on_update = None
+
+        assert controller._refresh_coalescer.refresh_count == refresh_count
+        assert program.station_durations[0] == 30
+        await controller.refresh()
+        assert program.station_durations[0] == 30
+
     @pytest.mark.asyncio
     async def test_program_manual_run(self, controller, program):
         await program.set_station_duration(0, 25)
@@ -258,3 +300,82 @@ class TestProgram:
         await program.set_program_schedule_type(0)
         assert program.days1 == 0
         assert program.days0 == 0
+
+    @pytest.mark.asyncio
+    async def test_edit(self, controller, program):
+        refresh_count = controller._refresh_coalescer.refresh_count
+
+        async with program.edit() as p:
+            await p.set_name("Edited")
+            await p.set_program_schedule_type(3)
+            await p.set_starting_in_days(2)
+            await p.set_interval_days(3)
+            await p.set_start_time_type(1)
+            await p.set_program_start_time(1, 120)
+            await p.set_station_duration(0, 300)
+            await p.set_use_weather_adjustments(True)
+            assert p.name == "Edited"
+
+        assert controller._refresh_coalescer.refresh_count == refresh_count + 1
+        program = controller.programs[0]
+        assert program.name == "Edited"
+        assert program.program_schedule_type == 3
+        assert program.starting_in_days == 2
+        assert program.interval_days == 3
+        assert program.start_time_type == 1
+        assert program.program_start_times[1] == 120
+        assert program.station_durations[0] == 300
+        assert program.use_weather_adjustments
+
+    @pytest.mark.asyncio
+    async def test_edit_invalid(self, controller, program):
+        with pytest.raises(ValueError):
+            async with program.edit() as p:
+                await p.set_program_schedule_type(3)
+                await p.set_interval_days(2)
+                await p.set_starting_in_days(2)
+
+        assert controller.programs[0].program_schedule_type == 0
+
+    def test_running_stations(self, controller):
+        controller._set_state(
+            {
+                "settings": {"ps": [[1, 60, 990], [1, 120, 1050], [2, 0, 0]]},
+                "status": {"sn": [1, 0, 0]},
+            }
+        )
+        for i in range(3):
+            controller.stations[i] = Station(controller, i)
+        programs = [Program(controller, i) for i in range(3)]
+
+        assert programs[0].is_running
+        assert programs[0].running_stations == [controller.stations[0]]
+        assert programs[0].queued_stations == [controller.stations[1]]
+        assert not programs[1].is_running
+        assert programs[1].queued_stations == [controller.stations[2]]
+        assert not programs[2].is_running
+        assert programs[2].running_stations == []
+
+    def test_schedule(self):
+        sunset_minus_60 = 60 | 1 << 12 | 1 << 13
+        sunrise_30 = 30 | 1 << 14
+        schedule = ProgramSchedule(
+            [0b1110111, 2, 3, [sunset_minus_60, sunrise_30, -1, 120], [60], "P1"]
+        )
+
+        assert schedule.enabled
+        assert schedule.use_weather_adjustments
+        assert schedule.odd_even_restriction == 1
+        assert schedule.program_schedule_type == 3
+        assert schedule.start_time_type == 1
+        assert schedule.start_time_offsets == (-60, 30, 0, 120)
+        assert schedule.start_time_offset_types == (
+            "sunset",
+            "sunrise",
+            "disabled",
+            "midnight",
+        )
+
+        repeating = ProgramSchedule([0, 0, 0, [sunrise_30, 2, 60, 0], [60], "P2"])
+        assert repeating.start_time_offsets == (30, 0, 0, 0)
+        assert repeating.start_time_offset_types == ("sunrise", None, None, None)
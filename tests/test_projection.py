@@ -0,0 +1,78 @@
+import datetime
+
+import pytest
+from const import MONDAY, PASSWORD, Clock
+from pyopensprinkler import Controller
+from pyopensprinkler.forecast import ForecastRun
+from pyopensprinkler.projection import project_runs
+
+DAY = 86400
+
+
+class TestProjection:
+    def test_totals(self):
+        runs = [
+            ForecastRun(600, 1200, 0, 0),
+            ForecastRun(1200, 1500, 1, 0),
+            ForecastRun(DAY + 600, DAY + 1200, 0, 1),
+            ForecastRun(590, 1510, 2, None),
+        ]
+        projection = project_runs(runs, {0: 10.0}, default_flow_rate=2.0)
+
+        assert projection.station_runtime == {0: 1200, 1: 300, 2: 920}
+        assert projection.station_volume == {0: 200.0, 1: 10.0}
+        assert projection.program_runtime == {0: 900, 1: 600}
+        assert projection.program_volume == {0: 110.0, 1: 100.0}
+        assert projection.day_runtime == {
+            datetime.date(1970, 1, 1): 900,
+            datetime.date(1970, 1, 2): 600,
+        }
+        assert projection.total_runtime == 1500
+        assert projection.total_volume == 210.0
+        assert projection.unknown_flow_stations == set()
+
+    def test_split_and_clip(self):
+        runs = [ForecastRun(DAY - 60, DAY + 120, 0, 0)]
+        projection = project_runs(runs, start=0, end=DAY + 60)
+
+        assert projection.day_runtime == {
+            datetime.date(1970, 1, 1): 60,
+            datetime.date(1970, 1, 2): 60,
+        }
+        assert projection.unknown_flow_stations == {0}
+        assert projection.total_volume == 0.0
+
+    def test_utc_offset(self):
+        runs = [ForecastRun(DAY - 60, DAY, 0, 0)]
+        projection = project_runs(runs, {0: 1.0}, utc_offset=3600)
+
+        assert projection.day_runtime == {datetime.date(1970, 1, 2): 60}
+        assert projection.day_volume == {datetime.date(1970, 1, 2): 1.0}
+
+    def test_zero_flow_rate(self):
+        runs = [ForecastRun(0, 60, 0, 0), ForecastRun(60, 120, 1, 0)]
+        projection = project_runs(runs, {1: 0.0}, default_flow_rate=0.0)
+
+        assert projection.total_volume == 0.0
+        assert projection.unknown_flow_stations == {0, 1}
+
+    @pytest.mark.asyncio
+    async def test_idle_controller(self, start_emulator):
+        emulator = await start_emulator({"clock": Clock(MONDAY)})
+        controller = Controller(
+            emulator.url, PASSWORD, {"auto_refresh_on_update": {"enabled": False}}
+        )
+        await controller.request(
+            "/cp",
+            {"pid": -1, "name": "P1", "v": "[3,127,0,[360,-1,-1,-1],[600,300]]"},
+        )
+        # flow sensor reading 0 while nothing runs
+        await controller.request("/co", {"sn1t": 2})
+        await controller.refresh()
+        assert controller.flow_rate == 0
+
+        projection = controller.projection(MONDAY, MONDAY + DAY, {1: 2.0})
+        assert projection.station_runtime == {0: 600, 1: 300}
+        assert projection.station_volume == {0: 0.0, 1: 10.0}
+        assert projection.unknown_flow_stations == {0}
+        await controller.session_close()
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from pyopensprinkler.refresh import RefreshCoalescer
+
+
+class TestRefreshCoalescer:
+    @pytest.mark.asyncio
+    async def test_burst_shares_one_refresh(self):
+        calls = []
+
+        async def refresh(parts):
+            calls.append(1)
+            return len(calls)
+
+        coalescer = RefreshCoalescer(refresh, 0.05)
+        futures = [coalescer.mark_dirty() for _ in range(16)]
+        results = await asyncio.gather(*futures)
+
+        assert calls == [1]
+        assert results == [1] * 16
+        assert not coalescer.dirty
+        assert coalescer.update_count == 16
+        assert coalescer.refresh_count == 1
+
+    @pytest.mark.asyncio
+    async def test_update_during_refresh_gets_new_refresh(self):
+        calls = []
+        started = asyncio.Event()
+
+        async def refresh(parts):
+            calls.append(1)
+            started.set()
+            await asyncio.sleep(0.05)
+            return len(calls)
+
+        coalescer = RefreshCoalescer(refresh, 0)
+        first = coalescer.mark_dirty()
+        await started.wait()
+        second = coalescer.mark_dirty()
+
+        assert await first == 1
+        assert await second == 2
+
+    @pytest.mark.asyncio
+    async def test_burst_merges_parts(self):
+        calls = []
+
+        async def refresh(parts):
+            calls.append(parts)
+
+        coalescer = RefreshCoalescer(refresh, 0.01)
+        coalescer.mark_dirty(["status"])
+        await coalescer.mark_dirty(["programs", "status"])
+        coalescer.mark_dirty(["stations"])
+        await coalescer.mark_dirty()
+
+        assert calls == [["programs", "status"], None]
+
+    @pytest.mark.asyncio
+    async def test_refresh_error(self):
+        async def refresh(parts):
+            raise RuntimeError("refresh failed")
+
+        coalescer = RefreshCoalescer(refresh, 0)
+        with pytest.raises(RuntimeError):
+            await coalescer.mark_dirty()
+
+    @pytest.mark.asyncio
+    async def test_wait_without_updates(self):
+        async def refresh(parts):
+            return True
+
+        coalescer = RefreshCoalescer(refresh, 0)
+        assert await coalescer.wait() is None
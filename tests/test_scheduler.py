@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from pyopensprinkler.scheduler import RequestScheduler
+
+
+class TestRequestScheduler:
+    @pytest.mark.asyncio
+    async def test_serializes_requests(self):
+        scheduler = RequestScheduler()
+        active = []
+        overlaps = []
+
+        async def request():
+            async with scheduler:
+                active.append(1)
+                overlaps.append(len(active))
+                await asyncio.sleep(0.01)
+                active.pop()
+
+        await asyncio.gather(*[request() for _ in range(5)])
+        assert max(overlaps) == 1
+        assert scheduler.in_flight == 0
+        assert scheduler.total_requests == 5
+        assert scheduler.max_queue_depth == 4
+
+    @pytest.mark.asyncio
+    async def test_fifo_order(self):
+        scheduler = RequestScheduler()
+        order = []
+
+        async def request(i):
+            async with scheduler:
+                await asyncio.sleep(0)
+                order.append(i)
+
+        await asyncio.gather(*[request(i) for i in range(10)])
+        assert order == list(range(10))
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        scheduler = RequestScheduler(3)
+        active = []
+        overlaps = []
+
+        async def request():
+            async with scheduler:
+                active.append(1)
+                overlaps.append(len(active))
+                await asyncio.sleep(0.01)
+                active.pop()
+
+        await asyncio.gather(*[request() for _ in range(9)])
+        assert max(overlaps) == 3
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter(self):
+        scheduler = RequestScheduler()
+        await scheduler.acquire()
+
+        waiter = asyncio.ensure_future(scheduler.acquire())
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth == 1
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert scheduler.queue_depth == 0
+
+        scheduler.release()
+        assert scheduler.in_flight == 0
+
+    def test_invalid_concurrency(self):
+        with pytest.raises(ValueError):
+            RequestScheduler(0)
@@ -0,0 +1,85 @@
+import json
+import os
+
+import pytest
+from const import PASSWORD
+from pyopensprinkler import Controller, OpenSprinklerNoStateError
+from pyopensprinkler.const import STATE_ENDPOINTS
+from pyopensprinkler.snapshot import SNAPSHOT_MAGIC, dump_snapshot, load_snapshot
+
+
+class TestSnapshot:
+    @pytest.mark.asyncio
+    async def test_save_and_load(self, controller, tmp_path):
+        path = tmp_path / "controller.snapshot"
+        with pytest.raises(OpenSprinklerNoStateError):
+            controller.save_snapshot(path)
+
+        await controller.refresh()
+        await controller.stations[0].set_name("snapshot")
+        controller.save_snapshot(path)
+        assert path.read_bytes().startswith(SNAPSHOT_MAGIC)
+
+        restored = Controller.from_snapshot(path, PASSWORD)
+        assert restored._baseUrl == controller._baseUrl
+        assert restored._state == controller._state
+        assert restored._state_times == controller._state_times
+        assert restored.stations[0].name == "snapshot"
+        assert list(restored.stations) == list(controller.stations)
+
+        await restored.refresh()
+        assert restored.stations[0].name == "snapshot"
+        await restored.session_close()
+
+    def test_load_ja_document(self, tmp_path):
+        state = {
+            "settings": {"devt": 1609718400, "ps": [[0, 0, 0]]},
+            "options": {"fwv": 219, "tz": 48},
+            "stations": {"snames": ["S01"], "maxlen": 32},
+            "status": {"sn": [0]},
+            "programs": {"pd": []},
+        }
+        path = tmp_path / "ja.json"
+        path.write_text(json.dumps(state))
+        os.utime(path, (1609718400, 1609718400))
+
+        snapshot = load_snapshot(path)
+        assert snapshot.url is None
+        assert snapshot.state_times["status"] == 1609718400
+
+        controller = Controller.from_snapshot(path)
+        assert controller.firmware_version == 219
+        assert controller.stations[0].name == "S01"
+        assert controller.last_refresh_time == 1609718400
+
+    def test_unsupported_version(self, tmp_path):
+        path = tmp_path / "future.snapshot"
+        path.write_bytes(SNAPSHOT_MAGIC + bytes([2]) + bytes(14))
+        with pytest.raises(ValueError):
+            load_snapshot(path)
+
+    def test_invalid_files(self, tmp_path):
+        path = tmp_path / "invalid.snapshot"
+        state = {part: {} for part in STATE_ENDPOINTS}
+        dump_snapshot(path, "http://a", state, {})
+        data = path.read_bytes()
+
+        for content in [b"", SNAPSHOT_MAGIC, data[:-1], b"not json", b"{}"]:
+            path.write_bytes(content)
+            with pytest.raises(ValueError, match="snapshot file"):
+                load_snapshot(path)
+
+    def test_no_refresh_times(self, tmp_path):
+        path = tmp_path / "controller.snapshot"
+        state = {
+            "settings": {"devt": 1609718400, "ps": []},
+            "options": {"fwv": 219},
+            "stations": {"snames": []},
+            "status": {"sn": []},
+            "programs": {"pd": []},
+        }
+        dump_snapshot(path, "http://a", state, {})
+
+        controller = Controller.from_snapshot(path)
+        assert controller.last_refresh_time is None
+        assert controller.firmware_version == 219
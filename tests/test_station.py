@@ -1,10 +1,16 @@
+import urllib
+
 import pytest
 from const import FIRMWARE_VERSION
+from pyopensprinkler import OpenSprinklerConnectionError
 from pyopensprinkler.const import (
     STATION_STATUS_IDLE,
     STATION_STATUS_MANUAL,
+    STATION_STATUS_MASTER_ENGAGED,
+    STATION_STATUS_WAITING,
     STATION_TYPE_STANDARD,
 )
+from pyopensprinkler.station import Station
 
 
 class TestStation:
@@ -198,3 +204,126 @@ class TestStation:
         assert not controller.stations[0].is_running
         assert not controller.stations[1].is_running
         await controller.stop_all_stations()
+
+    @pytest.mark.asyncio
+    async def test_batch(self, controller):
+        await controller.refresh()
+        refresh_count = controller._refresh_coalescer.refresh_count
+
+        async with controller.stations.batch() as batch:
+            await controller.stations[0].set_name("batch 0")
+            await controller.stations[1].set_name("batch 1")
+            await controller.stations[0].set_rain_delay_ignored(True)
+            await controller.stations[1].set_rain_delay_ignored(True)
+            assert batch.pending["i0"] == 3
+
+        assert controller._refresh_coalescer.refresh_count == refresh_count + 1
+        assert controller.stations[0].name == "batch 0"
+        assert controller.stations[1].name == "batch 1"
+        assert controller.stations[0].rain_delay_ignored
+        assert controller.stations[1].rain_delay_ignored
+
+        async with controller.stations.batch():
+            await controller.stations[0].set_rain_delay_ignored(False)
+            await controller.stations[1].set_rain_delay_ignored(False)
+        assert not controller.stations[0].rain_delay_ignored
+
+    @pytest.mark.asyncio
+    async def test_batch_discard(self, controller):
+        await controller.refresh()
+        name = controller.stations[0].name
+
+        with pytest.raises(RuntimeError):
+            async with controller.stations.batch():
+                await controller.stations[0].set_name("discarded")
+                await controller.stations[0].set_rain_delay_ignored(True)
+                raise RuntimeError("abort")
+
+        assert not controller.stations[0].rain_delay_ignored
+        await controller.refresh()
+        assert controller.stations[0].name == name
+
+    @pytest.mark.asyncio
+    async def test_batch_partial_failure(self, controller):
+        await controller.refresh()
+        name = controller.stations[1].name
+        request = controller.request
+        calls = []
+
+        async def failing_request(path, params=None, **kwargs):
+            if path == "/cs":
+                calls.append(params)
+                if len(calls) == 2:
+                    raise OpenSprinklerConnectionError("Cannot connect to controller")
+            return await request(path, params, **kwargs)
+
+        controller.request = failing_request
+        # one parameter per request
+        with pytest.raises(OpenSprinklerConnectionError):
+            async with controller.stations.batch(max_query_length=50):
+                await controller.stations[0].set_rain_delay_ignored(True)
+                await controller.stations[1].set_name("not sent")
+                await controller.stations[1].set_sensor_1_ignored(True)
+
+        assert len(calls) == 2
+        # the first request was applied, the state matches the controller
+        assert controller.stations[0].rain_delay_ignored
+        assert controller.stations[1].name == name
+        assert not controller.stations[1].sensor_1_ignored
+
+        controller.request = request
+        async with controller.stations.batch():
+            await controller.stations[0].set_rain_delay_ignored(False)
+
+    def test_batch_chunks(self, controller):
+        batch = controller.stations.batch(max_query_length=200)
+        for i in range(72):
+            batch.update({f"s{i}": f"Station {i:02}"})
+
+        chunks = batch._chunk_params()
+        assert sum(len(chunk) for chunk in chunks) == 72
+        for chunk in chunks:
+            assert len(urllib.parse.urlencode(chunk)) + len("&pw=") + 32 <= 200
+
+    def test_bit_check(self, controller):
+        controller._set_state({"stations": {"masop": [254, 1], "stn_dis": [0, 128]}})
+        stations = [Station(controller, i) for i in range(16)]
+
+        assert not stations[0].master_1_operation_enabled
+        assert stations[1].master_1_operation_enabled
+        assert stations[8].master_1_operation_enabled
+        assert not stations[9].master_1_operation_enabled
+        assert stations[14].enabled
+        assert not stations[15].enabled
+
+    def test_table(self, controller):
+        controller._set_state(
+            {
+                "options": {"tz": 48, "mas": 3, "mas2": 0},
+                "settings": {
+                    "devt": 1000,
+                    "ps": [[99, 60, 990], [2, 120, 1050], [0, 0, 0]],
+                },
+                "status": {"sn": [1, 0, 1]},
+                "stations": {"snames": ["S01", "S02", "S03"], "stn_dis": [2]},
+            }
+        )
+        for i in range(3):
+            controller.stations[i] = Station(controller, i)
+
+        table = controller.station_table()
+        assert list(table["index"]) == [0, 1, 2]
+        assert table["name"] == ["S01", "S02", "S03"]
+        assert list(table["end"]) == [1060, 1170, 0]
+        assert list(table["stn_dis"]) == [0, 1, 0]
+        assert table["status"] == [controller.stations[i].status for i in range(3)]
+        assert table["status"] == [
+            STATION_STATUS_MANUAL,
+            STATION_STATUS_WAITING,
+            STATION_STATUS_MASTER_ENGAGED,
+        ]
+
+        numpy = pytest.importorskip("numpy")
+        table = controller.station_table(as_numpy=True)
+        assert isinstance(table, numpy.ndarray)
+        assert list(table["end"]) == [1060, 1170, 0]